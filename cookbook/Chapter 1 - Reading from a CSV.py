@@ -60,6 +60,15 @@ pl_sorted_df=pl_fixed_df.sort("Index_Date")
 
 print(pl_sorted_df.head(3))
 
+# %%
+# Decoding a Latin-1 file like this happens in Python, all at once, before Polars even starts parsing.
+# That's fine for bikes.csv, but not for a file of several GB. `transcode.scan_csv` converts the file to
+# UTF-8 one block at a time (fixing mangled headers like `BrÃ©beuf` on the way) and gives us a lazy scan.
+from cookbook_tools import transcode
+
+pl_bikes_lazy = transcode.scan_csv("../data/bikes.csv", encoding="latin1", separator=";")
+pl_bikes_lazy.select("Date", "Berri 1").head(3).collect()
+
 # %%
 # Selecting a column
 # When you read a CSV, you get a kind of object called a `DataFrame`, which is made up of rows and columns. You get columns out of a DataFrame the same way you get elements out of a dictionary.
@@ -96,3 +105,14 @@ plt.title("Berri 1 plot")
 plt.xlabel("Date")
 plt.ylabel("Berri 1 People Count")
 plt.show()
+
+# %%
+# By default every bike count is read as an `Int64`, even though no more than a few thousand cyclists use a path in a day.
+# `optimize_schema` (see Chapter 5 for more) picks the smallest dtype that still holds every value.
+from cookbook_tools import schema
+
+bikes_schema = schema.optimize_schema(pl_fixed_df)
+print(bikes_schema)
+
+# The two "données non disponibles" columns are completely empty:
+print(schema.constant_columns(pl_fixed_df))
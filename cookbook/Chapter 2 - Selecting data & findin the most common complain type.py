@@ -5,15 +5,18 @@ import polars as pl
 # %%
 # We're going to use a new dataset here, to demonstrate how to deal with larger datasets. This is a subset of the of 311 service requests from [NYC Open Data](https://nycopendata.socrata.com/Social-Services/311-Service-Requests-from-2010-to-Present/erm2-nwe9).
 # because of mixed types we specify dtype to prevent any errors
-complaints = pd.read_csv("../data/311-service-requests.csv", dtype="unicode")
-complaints.head()
-
-# %%
 # TODO: rewrite the above using the polars library and call the data frame pl_complaints
 # Hint: we need the dtype argument reading all columns in as strings above in Pandas due to the zip code column containing NaNs as "NA" and some zip codes containing a dash like 1234-456
 # you cannot exactly do the same in Polars but you can read about some other solutions here:
 # see a discussion about dtype argument here: https://github.com/pola-rs/polars/issues/8230
-pl_complaints = pl.read_csv("../data/311-service-requests.csv", schema_overrides={"*": pl.Utf8}, null_values=["N/A", "77092-2016", "55164-0737"], infer_schema_length=10000, ignore_errors=True)
+# `read_both` parses the file once with Polars, every column as a string and with the same missing values as
+# `pd.read_csv(..., dtype="unicode")`, and hands pandas an Arrow-backed view of the same data.
+from cookbook_tools.dual import read_both
+
+pl_complaints, complaints = read_both("complaints")
+complaints.head()
+
+# %%
 pl_complaints.head()
 
 # %%
@@ -59,6 +62,15 @@ complaint_counts[:10]
 pl_complaint_counts = pl_complaints.group_by("Complaint Type").agg(pl.len().alias("count")).sort("count", descending=True)
 pl_complaint_counts.head(10)
 
+# %%
+# Sorting every complaint type just to keep ten of them is wasteful. `top_n` only keeps the ten largest
+# (with `top_k` under the hood), and still returns them in order. Ties are broken by the second key,
+# and after that by the original row order -- just like a stable sort would.
+from cookbook_tools.topn import top_n
+
+pl_complaint_counts = pl_complaints.group_by("Complaint Type").agg(pl.len().alias("count"))
+top_n(pl_complaint_counts, 10, by=["count", "Complaint Type"], descending=[True, False])
+
 # %%
 # Plot the top 10 most common complaints
 complaint_counts[:10].plot(kind="bar")
@@ -71,7 +83,7 @@ plt.show()
 
 # %%
 # TODO: please do the same with Polars
-pl_complaint_counts_10 = pl_complaint_counts.head(10)
+pl_complaint_counts_10 = top_n(pl_complaint_counts, 10, by=["count", "Complaint Type"], descending=[True, False])
 
 plt.bar(pl_complaint_counts_10["Complaint Type"], pl_complaint_counts_10["count"])
 plt.title("Top 10 Complaint Types")
@@ -16,11 +16,13 @@ pd.set_option("display.max_columns", 60)
 # %%
 # Let's continue with our NYC 311 service requests example.
 # because of mixed types we specify dtype to prevent any errors
-complaints = pd.read_csv("../data/311-service-requests.csv", dtype="unicode")
-
-# %%
 # TODO: rewrite the above using the polars library (you might have to import it above) and call the data frame pl_complaints
-pl_complaints = pl.read_csv("../data/311-service-requests.csv", infer_schema_length=10000).with_row_count("index")
+# `read_both` parses the file once with Polars, every column as a string like `dtype="unicode"`, and hands pandas
+# an Arrow-backed view of the same data.
+from cookbook_tools.dual import read_both
+
+pl_complaints, complaints = read_both("complaints")
+pl_complaints = pl_complaints.with_row_index("index")
 
 # %%
 # 3.1 Selecting only noise complaints
@@ -74,6 +76,31 @@ pl_complaints.filter(is_noise_pl & in_brooklyn_pl).select(
     ["index", "Complaint Type", "Borough", "Created Date", "Descriptor"]
 ).head(10)
 
+# %%
+# Every one of these filters compares all the rows of the table. If you filter on the same columns over and
+# over again, it pays off to sort the table by them once: all the rows for ("Noise - Street/Sidewalk", "BROOKLYN")
+# then sit next to each other, and finding them is a binary search instead of a full scan.
+from cookbook_tools.sorted_index import SortedIndex
+
+complaints_index = SortedIndex(pl_complaints, ["Complaint Type", "Borough"])
+
+# The offset index tells us where every (Complaint Type, Borough) pair starts, and how many rows it has
+print(complaints_index.ranges.head(10))
+
+complaints_index.equal("Noise - Street/Sidewalk", "BROOKLYN").select(
+    ["index", "Complaint Type", "Borough", "Created Date", "Descriptor"]
+).head(10)
+
+# %%
+# We can also give only the first key, or a prefix of it:
+complaints_index.equal("Noise - Street/Sidewalk").head(3)
+complaints_index.startswith("Noise").group_by("Complaint Type").agg(pl.len())
+
+# Written to Parquet, the sorted table has tight min/max statistics per row group,
+# so a lazy scan with a filter can skip the row groups that can't match.
+complaints_index.write_parquet("../data/311-service-requests.sorted.parquet")
+pl.scan_parquet("../data/311-service-requests.sorted.parquet").filter(is_noise_pl & in_brooklyn_pl).collect()
+
 
 # %%
 # 3.3 So, which borough has the most noise complaints?
@@ -85,7 +112,7 @@ noise_complaints["Borough"].value_counts()
 # TODO: rewrite the above using the polars library
 is_noise_pl = pl.col("Complaint Type") == "Noise - Street/Sidewalk"
 noise_complaints_pl = pl_complaints.filter(is_noise_pl)
-noise_complaints_pl.group_by("Borough").agg(pl.count()).sort("count", descending=True)
+noise_complaints_pl.group_by("Borough").agg(pl.len().alias("count")).sort("count", descending=True)
 
 
 # %%
@@ -104,10 +131,10 @@ noise_complaint_counts / complaint_counts.astype(float)
 # %%
 # TODO: rewrite the above using the polars library
 # Calculate noise complaint counts by borough
-noise_complaint_counts_pl = noise_complaints_pl.group_by("Borough").agg(pl.count().alias("noise_count"))
+noise_complaint_counts_pl = noise_complaints_pl.group_by("Borough").agg(pl.len().alias("noise_count"))
 
 # Calculate total complaint counts by borough
-complaint_counts_pl = pl_complaints.group_by("Borough").agg(pl.count().alias("total_count"))
+complaint_counts_pl = pl_complaints.group_by("Borough").agg(pl.len().alias("total_count"))
 
 # Join the two dataframes and calculate the ratio
 result_pl = noise_complaint_counts_pl.join(complaint_counts_pl, on="Borough").with_columns(
@@ -141,3 +168,37 @@ plt.ylabel("Ratio of Noise Complaints to Total Complaints")
 plt.xticks(rotation=45)
 plt.tight_layout()
 plt.show()
+
+# %%
+# New service requests come in all the time. Rather than recomputing these counts from the whole file on every
+# refresh, `ComplaintCounter` only parses the bytes that were appended since the last time, and adds their
+# counts to running totals that are checkpointed to disk.
+# Let's pretend the 311 file arrives in pieces: we append it to a "live" file a chunk at a time.
+import tempfile
+from pathlib import Path
+
+from cookbook_tools.incremental import ComplaintCounter
+
+feed_dir = Path(tempfile.mkdtemp())
+live_file = feed_dir / "311-live.csv"
+raw_bytes = Path("../data/311-service-requests.csv").read_bytes()
+
+chunk_size = len(raw_bytes) // 10 + 1
+for start in range(0, len(raw_bytes), chunk_size):
+    with open(live_file, "ab") as f:
+        f.write(raw_bytes[start : start + chunk_size])
+    # A new counter every time, as if the process had been restarted: it picks up from the checkpoint.
+    counter = ComplaintCounter(feed_dir / "checkpoint.json")
+    print(f"{counter.ingest(feed_dir)} new rows")
+
+print(counter.noise_ratio())
+
+# Same numbers as the full recompute above:
+from polars.testing import assert_frame_equal
+
+assert_frame_equal(
+    counter.noise_ratio().drop_nulls("Borough").sort("Borough"),
+    result_pl.drop_nulls("Borough").sort("Borough"),
+    check_column_order=False,
+    check_dtypes=False,
+)
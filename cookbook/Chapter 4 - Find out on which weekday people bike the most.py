@@ -14,26 +14,19 @@ pd.set_option("display.width", 5000)
 pd.set_option("display.max_columns", 60)
 
 # %% Load the data
-bikes = pd.read_csv(
-    "../data/bikes.csv",
-    sep=";",
-    encoding="latin1",
-    parse_dates=["Date"],
-    dayfirst=True,
-    index_col="Date",
-)
+# TODO: Load the data using Polars
+# `read_both` parses bikes.csv once with Polars (the catalog converts the Latin-1 file to UTF-8 block by block, so
+# it can be read lazily) and gives pandas an Arrow-backed view of the same data. The pandas frame has the same 'Date'
+# index as `pd.read_csv("../data/bikes.csv", sep=";", encoding="latin1", parse_dates=["Date"], dayfirst=True,
+# index_col="Date")`.
+from cookbook_tools.dual import read_both
+
+pl_bikes, bikes = read_both("bikes")
+print(bikes.dtypes)
+
 bikes["Berri 1"].plot()
 plt.show()
 
-# %% Load the data
-# TODO: Load the data using Polars
-pl_bikes = pl.read_csv(
-    "../data/bikes.csv",
-    separator=";",
-    encoding="latin1",
-    try_parse_dates=True,
-)
-
 # Plot Berri 1 data
 plt.figure(figsize=(15, 5))
 plt.plot(pl_bikes["Date"], pl_bikes["Berri 1"])
@@ -136,6 +129,29 @@ pl_weekday_counts = pl_weekday_counts.with_columns(
     pl.col("weekday").replace_strict(weekday_map).alias("weekday")
 )
 
+# %%
+# We'll need weekday names in other places too, so the cookbook registers them as a `.cookbook` namespace
+# on Polars expressions. It's made of plain Polars expressions, so it also works inside a lazy query:
+import cookbook_tools.namespace  # noqa: F401  (registers `.cookbook`)
+
+pl_weekday_counts = (
+    pl_berri_bikes.lazy()
+    .group_by(pl.col("Date").cookbook.weekday_name().alias("weekday"))
+    .agg(pl.sum("Berri 1").alias("total_cyclists"))
+    .sort("weekday")  # weekday_name() is an Enum, so this sorts Monday first
+    .collect()
+)
+print(pl_weekday_counts)
+
+
+# %%
+# If we'll be slicing the counts by other calendar dimensions as well (month, or month and weekday), we can
+# pre-aggregate them once in a `TimeCube` (see Chapter 6) and answer each question from the cube.
+from cookbook_tools.cube import TimeCube
+
+bikes_cube = TimeCube.build(pl_bikes, "Date", {"Berri 1": pl.col("Berri 1")})
+print(bikes_cube.rollup(["weekday"]).select("weekday", "Berri 1_sum"))
+print(bikes_cube.rollup(["month", "weekday"]).select("month", "weekday", "Berri 1_mean"))
 
 # %% Plot results
 weekday_counts.plot(kind="bar")
@@ -152,5 +168,26 @@ plt.ylabel("Total Cyclists")
 plt.title("Total Cyclists by Weekday")
 plt.show()
 
+# %% Does the weather matter?
+# Let's bring in the weather data from Chapters 5 and 6. It's hourly, so we first roll it up to one row per day,
+# and then match every counter's day to that day's weather at the counter's station with one "as-of" join. Both
+# frames are sorted by date within each station already, so the join just walks through them side by side.
+from cookbook_tools.catalog import load_weather
+from cookbook_tools.ridership import ridership_weather
+
+pl_weather = load_weather().collect()
+pl_ridership = ridership_weather(pl_bikes, pl_weather)
+print(pl_ridership.head())
+
+# Unsurprisingly, people bike more when it's warm:
+print(pl_ridership.group_by("counter").agg(pl.corr("cyclists", "temperature_mean").alias("correlation")).sort("counter"))
+
+plt.scatter(pl_ridership.filter(pl.col("counter") == "Berri 1")["temperature_mean"],
+            pl_ridership.filter(pl.col("counter") == "Berri 1")["cyclists"])
+plt.xlabel("Mean temperature (°C)")
+plt.ylabel("Cyclists on Berri 1")
+plt.title("Cyclists vs. temperature")
+plt.show()
+
 # %% Final message
 print("Analysis complete!")
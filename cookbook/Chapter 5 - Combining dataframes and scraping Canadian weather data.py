@@ -12,8 +12,13 @@ plt.rcParams["font.family"] = "sans-serif"
 # By the end of this chapter, we're going to have downloaded all of Canada's weather data for 2012, and saved it to a CSV. We'll do this by downloading it one month at a time, and then combining all the months together.
 # Here's the temperature every hour for 2012!
 
-# Read the CSV file
-weather_2012_final = pl.read_csv("../data/weather_2012.csv").with_columns(pl.col("date_time").str.to_datetime()).sort("date_time")
+# We save the year as Parquet, sorted by `date_time` (see the end of this chapter), so reading it back needs no
+# date parsing and no sorting. If the Parquet file isn't there yet, it is made once from the CSV that ships with
+# the cookbook; after that the Parquet file is the only copy anybody reads.
+from cookbook_tools.catalog import load_weather, weather_parquet
+from cookbook_tools.sorted_parquet import scan_sorted_parquet, write_sorted_parquet
+
+weather_2012_final = load_weather().collect()
 
 # %%# Create the plot
 plt.figure(figsize=(15, 6))
@@ -149,15 +154,29 @@ plt.ylabel("Median Temperature (°C)")
 plt.title("Median Temperature by Hour")
 plt.grid(True)
 plt.show()
+
+# %%
+# An exact median needs every value of the column in memory. On a few billion rows an approximation is often
+# good enough: `approx_median` counts the values in logarithmic buckets (a DDSketch). It returns the lower of the
+# two middle values rather than their average, so it is within `relative_accuracy` (here 1%) of
+# `quantile(0.5, interpolation="lower")`; compared with `median()` it can be further off when the two middle values
+# differ a lot. The sketches of different partitions can be merged, too.
+from cookbook_tools import approx
+
+approx_temp_medians = approx.approx_median(temperatures, "temperature_c", by="Hour", relative_accuracy=0.01).sort("Hour")
+lower_temp_medians = temperatures.group_by("Hour").agg(pl.col("temperature_c").quantile(0.5, interpolation="lower"))
+print(approx_temp_medians.join(lower_temp_medians, on="Hour", suffix="_exact").sort("Hour"))
 # %%
 # Okay, so what if we want the data for the whole year? Ideally the API would just let us download that, but I couldn't figure out a way to do that.
 # First, let's put our work from above into a function that gets the weather for a given month.
 
+# The column name clean-up is also available as `df.cookbook.clean_column_names()`, see cookbook_tools/namespace.py
+import cookbook_tools.namespace  # noqa: F401  (registers `.cookbook`)
+
 def clean_data(data):
     data = data.pipe(select_no_nulls_or_nan)
     data = data.drop(["Year", "Month", "Day", "Time (LST)"])
-    data = data.rename(
-    {col: col.replace('ï»¿"', " ").replace("Â", "").replace(')"', ")") for col in data.columns})
+    data = data.cookbook.clean_column_names()
     data = data.with_columns([
     pl.col('Date/Time (LST)').alias('datetime'),
     pl.col('Station Name').alias('Station_Name'),
@@ -185,7 +204,15 @@ print(download_weather_month(2013, 1).head())
 # Now, let's use a list comprehension to download all our data and then just concatenate these data frames
 # This might take a while
 # Download data for each month and store in a list
-data_by_month = [download_weather_month(2012, i) for i in range(1, 13)]
+# The downloads mostly wait on the network, so we run a few of them at the same time in a small thread pool.
+# Parsing them still uses Polars' own thread pool (`pl.thread_pool_size()` threads, set with the
+# POLARS_MAX_THREADS environment variable before Polars is imported), so keep `max_workers` small.
+# `python -m cookbook_tools.threads bench` shows how each chapter's pipeline scales with that setting.
+from concurrent.futures import ThreadPoolExecutor
+
+print(f"Polars uses {pl.thread_pool_size()} threads")
+with ThreadPoolExecutor(max_workers=4) as pool:
+    data_by_month = list(pool.map(lambda month: download_weather_month(2012, month), range(1, 13)))
 
 # Get all unique column names across all DataFrames
 all_columns = set()
@@ -209,5 +236,63 @@ weather_2012 = pl.concat(data_by_month_aligned)
 # Print the result
 print(weather_2012.head())
 # %%
-# Now, let's save the data.
-weather_2012.write_csv("../data/weather_2012.csv")
+# The rest of the cookbook (Chapter 6, the catalog, ...) expects the columns of the shipped weather_2012.csv, so
+# give the downloaded columns those names and types. This also drops the raw names like `temp (°c)` that
+# `clean_data` kept next to the aliases.
+WEATHER_2012_SCHEMA = {
+    "date_time": pl.Datetime("us"),
+    "longitude": pl.Float64,
+    "latitude": pl.Float64,
+    "station_name": pl.String,
+    "climate_id": pl.Int64,
+    "temperature_c": pl.Float64,
+    "dew_point_temp_c": pl.Float64,
+    "relative_humidity": pl.Int64,
+    "wind_speed_kmh": pl.Int64,
+    "visibility_km": pl.Float64,
+    "station_pressure_kpa": pl.Float64,
+    "weather": pl.String,
+}
+weather_2012 = weather_2012.rename(
+    {"datetime": "date_time", "longitude (x)": "longitude", "latitude (y)": "latitude"}, strict=False
+).select(pl.col(name).cast(dtype) for name, dtype in WEATHER_2012_SCHEMA.items())
+print(weather_2012.head())
+
+# %%
+# Now, let's save the data. Instead of a CSV we write zstd-compressed Parquet, sorted by `date_time`, with min/max
+# statistics for every row group of about a month.
+write_sorted_parquet(weather_2012, "../data/weather_2012.parquet", by="date_time")
+
+# A filter on a time range is pushed down into the scan, and only the row groups that overlap it are read.
+# The data also comes back flagged as sorted, so Polars won't sort it again for `join_asof` or `group_by_dynamic`.
+march = scan_sorted_parquet("../data/weather_2012.parquet").filter(
+    pl.col("date_time").is_between(pl.datetime(2012, 3, 1), pl.datetime(2012, 3, 31, 23))
+)
+print(march.explain())
+print(march.collect()["date_time"].flags)
+
+# %%
+# The Parquet file keeps the dtypes the data was first read with: `Int64`, `Float64` and `String`, which is what
+# Polars infers for every column of a CSV. That is safe, but `relative_humidity` never goes above 100 and
+# `station_name` is the same string on every single row.
+# `optimize_schema` profiles the data once and picks the narrowest dtype that still holds every value:
+# small integers, `Float32` where the precision allows it, and `Categorical` for low-cardinality strings.
+# We profile the same Parquet file that we are going to read again with the schema below.
+from cookbook_tools import schema
+
+weather_full = scan_sorted_parquet(weather_parquet()).collect()
+weather_schema = schema.optimize_schema(weather_full)
+print(weather_schema)
+
+# Columns that hold the same value on every row are worth knowing about, too:
+print(schema.constant_columns(weather_full))
+
+print(f"Default dtypes:   {weather_full.estimated_size('kb'):.0f} kB")
+print(f"Optimized dtypes: {schema.apply_schema(weather_full, weather_schema).estimated_size('kb'):.0f} kB")
+
+# Save the schema next to the data, so later reads can use it directly. `Categorical` (unlike `Enum`) still
+# accepts a kind of weather that wasn't in the data we profiled.
+schema.save_schema(weather_schema, "../data/weather_2012.schema.arrow")
+saved_schema = schema.load_schema("../data/weather_2012.schema.arrow")
+weather_2012_small = scan_sorted_parquet(weather_parquet()).cast(saved_schema).collect()
+print(weather_2012_small.schema)
@@ -10,9 +10,10 @@ plt.rcParams["font.family"] = "sans-serif"
 
 # %%
 # We saw earlier that pandas is really good at dealing with dates. It is also amazing with strings! We're going to go back to our weather data from Chapter 5, here.
-weather_2012 = pl.read_csv(
-    "../data/weather_2012.csv", try_parse_dates=True
-)
+# Chapter 5 saved it as Parquet sorted by `date_time`, so the dates are already parsed and sorted.
+from cookbook_tools.catalog import load_weather
+
+weather_2012 = load_weather().collect()
 weather_2012[:100]
 # %%
 # You'll see that the 'Weather' column has a text description of the weather that was going on each hour. We'll assume it's snowing if the text description contains "Snow".
@@ -48,6 +49,18 @@ plt.tight_layout()
 plt.show()
 
 # Unsurprisingly, July and August are the warmest.
+
+# %%
+# The same medians, approximated: every month is summarized by a small sketch of bucket counts. Sketches of
+# different files or workers can be combined with `merge_quantile_sketches` before asking for the median.
+from cookbook_tools import approx
+
+monthly_sketches = [
+    approx.quantile_sketch(month_df, "temperature_c", by="month")
+    for month_df in weather_2012.with_columns(pl.col("date_time").dt.month().alias("month")).partition_by("month")
+]
+merged_sketch = approx.merge_quantile_sketches(monthly_sketches, by="month")
+print(approx.sketch_quantile(merged_sketch, 0.5, by="month").sort("month"))
 # %%
 # # So we can think of snowiness as being a bunch of 1s and 0s instead of `True`s and `False`s:
 # Convert boolean to float and show first 10 values
@@ -74,3 +87,49 @@ plt.show()
 # So now we know! In 2012, December was the snowiest month. Also, this graph suggests something that I feel -- it starts snowing pretty abruptly in November, and then tapers off slowly and takes a long time to stop, with the last snow usually being in April or May.
 
 # %%
+# Chapters 4, 5 and 6 slice the same kind of data by one calendar dimension at a time (weekday, hour, month), and
+# every question reads all the rows again. A `TimeCube` aggregates the data once per (year, month, weekday, hour),
+# after which any combination of those dimensions only needs to combine a few thousand pre-aggregated cells.
+from cookbook_tools.cube import TimeCube
+
+weather_measures = {
+    "temperature_c": pl.col("temperature_c"),
+    "snowing": pl.col("weather").str.contains("Snow"),
+}
+weather_cube = TimeCube.build(weather_2012, "date_time", weather_measures, sketch=["temperature_c"])
+print(weather_cube.cells.shape)
+
+# The snow percentage per month is the mean of "snowing":
+print(weather_cube.rollup(["month"]).select("month", "snowing_mean"))
+# The (approximate) median temperature per month, and per hour of the day like in Chapter 5:
+print(weather_cube.median("temperature_c", ["month"]))
+print(weather_cube.median("temperature_c", ["hour"]))
+# Or combinations we haven't looked at yet, like the snowiest hours of the day in each month:
+print(weather_cube.rollup(["month", "hour"]).select("month", "hour", "snowing_mean"))
+
+# New hours of data don't require a rebuild: aggregate just them and merge them into the cube.
+# weather_cube = weather_cube.append(new_hours, "date_time", weather_measures)
+
+# %%
+# Medians per month don't tell us how the weather changes from hour to hour. `RollingStats` computes, for every
+# hour and every station, the mean, min and max over the last 24 hours and the last 7 days, and how many hours
+# in a row it has been snowing.
+from polars.testing import assert_frame_equal
+
+from cookbook_tools.rolling import RollingStats, rolling_stats
+
+last_week = pl.col("date_time") >= pl.datetime(2012, 12, 25)
+rolling = RollingStats.build(weather_2012.filter(~last_week))
+
+# When new hours come in, only the windows that contain them are recomputed. Here they come in one at a time:
+for new_hour in weather_2012.filter(last_week).iter_slices(1):
+    rolling = rolling.append(new_hour)
+
+# That gives exactly the same numbers as computing everything from scratch:
+assert_frame_equal(rolling.stats, rolling_stats(weather_2012))
+print(rolling.stats.select("date_time", "temperature_c_mean_24h", "temperature_c_min_7d", "snow_streak_hours").tail(5))
+
+# The longest snowfall of the year:
+print(rolling.stats.top_k(1, by="snow_streak_hours").select("date_time", "snow_streak_hours"))
+
+# %%
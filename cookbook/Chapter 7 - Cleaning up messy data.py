@@ -14,12 +14,14 @@ plt.rcParams["font.family"] = "sans-serif"
 # %%
 # One of the main problems with messy data is: how do you know if it's messy or not?
 # We're going to use the NYC 311 service request dataset again here, since it's big and a bit unwieldy.
-requests = pd.read_csv("../data/311-service-requests.csv", dtype="unicode")
-#requests.head()
+# `read_both` parses the file once with Polars, and hands pandas an Arrow-backed view of the same memory, all
+# columns as strings like `pd.read_csv(..., dtype="unicode")`.
+from cookbook_tools.dual import read_both
 
 # TODO: load the data with Polars
-requests_pl = pl.read_csv("../data/311-service-requests.csv", infer_schema_length=10000)
+requests_pl, requests = read_both("complaints")
 requests_pl.head()
+print(requests.dtypes)
 
 # %%
 # How to know if your data is messy?
@@ -48,13 +50,42 @@ requests["Incident Zip"].unique()
 unique_zips_pl = requests_pl["Incident Zip"].unique()
 print(unique_zips_pl)
 
+# If we only want to know *how many* distinct zip codes there are, we don't need to keep all of them around.
+# A HyperLogLog sketch estimates the count from 2**12 small registers, with an error of about 1.6%.
+from cookbook_tools import approx
+
+print(approx.approx_n_unique(requests_pl, "Incident Zip", precision=12))
+print(requests_pl["Incident Zip"].drop_nulls().n_unique())
+
+# %%
+# Each of the checks we're about to do (unique values, dashes, long zip codes, "00000", close vs. far, cities) is a
+# separate query that reads the column again. `profile_columns` computes all of them in a single pass and gives us
+# one row per column: null and N/A counts, distinct values, how many values match each pattern, a histogram of
+# value lengths and the most common values.
+# We profile the raw file, every value as the string it is in the CSV and only empty fields as null: in
+# `requests_pl` the catalog has already turned "N/A" and friends into nulls, which would hide exactly the dirty
+# values we are looking for.
+from cookbook_tools.quality import PATTERNS, profile_columns
+
+raw_requests = pl.scan_csv("../data/311-service-requests.csv", infer_schema=False)
+zip_profile = profile_columns(
+    raw_requests,
+    ["Incident Zip", "City"],
+    na_values=["NO CLUE", "N/A", "0"],
+    patterns={**PATTERNS, "close": r"^[01]"},
+)
+with pl.Config(tbl_cols=-1, fmt_table_cell_list_len=10):
+    print(zip_profile)
+
 # %%
 # Fixing the nan values and string/float confusion
 # We can pass a `na_values` option to `pd.read_csv` to clean this up a little bit. We can also specify that the type of Incident Zip is a string, not a float.
+# Our frame is already parsed, with every column as a string, so instead of reading the file again with
+# `pd.read_csv(..., na_values=na_values, dtype={"Incident Zip": str})` we turn those values into NaN in the frame
+# we have.
 na_values = ["NO CLUE", "N/A", "0"]
-requests = pd.read_csv(
-    "../data/311-service-requests.csv", na_values=na_values, dtype={"Incident Zip": str}
-)
+requests_with_na = requests.mask(requests.isin(na_values))
+requests = requests_with_na.copy()
 requests["Incident Zip"].unique()
 
 # TODO: please implement this with Polars
@@ -195,6 +226,19 @@ requests_far = (
 )
 print("Rows with 'far' zip codes:")
 print(requests_far)
+
+# `sort` needs the whole table in memory. For a table bigger than RAM (say, the full 311 history),
+# `external_sort` sorts it in runs that are spilled to disk, merges them a block at a time and
+# streams the result straight into a Parquet (or IPC, or CSV) file.
+from cookbook_tools.external_sort import external_sort
+
+external_sort(
+    requests_pl.lazy().filter(is_far).select(["Incident Zip", "Descriptor", "City"]),
+    "../data/311-far-zips.sorted.parquet",
+    by="Incident Zip",
+    run_size=100_000,
+)
+print(pl.read_parquet("../data/311-far-zips.sorted.parquet"))
 # %%
 # Filtering by zip code is probably a bad way to handle this -- we should really be looking at the city instead.
 requests["City"].str.upper().value_counts()
@@ -208,10 +252,9 @@ print(city_counts)
 
 # %%
 # Let's turn this analysis into a function putting it all together:
+# We start again from the requests with the `na_values` as NaN, as if we had just read them.
 na_values = ["NO CLUE", "N/A", "0"]
-requests = pd.read_csv(
-    "../data/311-service-requests.csv", na_values=na_values, dtype={"Incident Zip": str}
-)
+requests = requests_with_na.copy()
 
 
 def fix_zip_codes(zips):
@@ -248,4 +291,12 @@ requests_pl = requests_pl.with_columns(
 unique_zips_pl = requests_pl["Incident Zip"].unique().sort()
 print("Unique 'Incident Zip' values after fixing:")
 print(unique_zips_pl)
+
+# %%
+# The same clean-up is registered as a `.cookbook` expression namespace, so it can be used in any (lazy) query
+# without copying the function around. It also takes the `na_values` we used for pandas earlier.
+import cookbook_tools.namespace  # noqa: F401  (registers `.cookbook`)
+
+requests_pl = requests_pl.with_columns(pl.col("Incident Zip").cookbook.fix_zip_codes(na_values=na_values))
+print(requests_pl["Incident Zip"].unique().sort())
 # %%
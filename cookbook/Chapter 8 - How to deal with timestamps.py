@@ -7,16 +7,15 @@ import polars as pl
 # It's not obvious how to deal with Unix timestamps in pandas -- it took me quite a while to figure this out. The file we're using here is a popularity-contest file of packages.
 
 # Read it, and remove the last row
-popcon = pd.read_csv(
-    "../data/popularity-contest",
-    sep=" ",
-)[:-1]
-popcon.columns = ["atime", "ctime", "package-name", "mru-program", "tag"]
+# `read_both` parses the file once with Polars, through the shared catalog (which also drops the first and the
+# last line and names the columns), and hands pandas an Arrow-backed view of the same data. pandas gets `atime`
+# and `ctime` as the integers in the file, like `pd.read_csv` would give them.
+from cookbook_tools.dual import read_both
+
+popcon_pl, popcon = read_both("popcon")
 popcon[:5]
 
 # TODO: please reimplement this using Polars
-popcon_pl = pl.read_csv("../data/popularity-contest", separator=' ', infer_schema_length = 10000)[:-1]
-popcon_pl.columns = ["atime", "ctime", "package-name", "mru-program", "tag"]
 popcon_pl.head()
 
 # %%
@@ -26,12 +25,9 @@ popcon["atime"] = popcon["atime"].astype(int)
 popcon["ctime"] = popcon["ctime"].astype(int)
 
 # TODO: please reimplement this using Polars
-popcon_pl = popcon_pl.with_columns([
-    pl.col("atime").cast(pl.Int64),
-    pl.col("ctime").cast(pl.Int64)
-])
-
-popcon_pl.head()
+# The catalog has already turned `atime` and `ctime` into datetimes (see the next cell for how), so there is
+# nothing to cast. These are the integers they were made from; the nulls were 0 in the file:
+popcon_pl.select(pl.col("atime", "ctime").dt.epoch("s")).head()
 
 # %%
 # Every numpy array and pandas series has a dtype -- this is usually `int64`, `float64`, or `object`. Some of the time types available are `datetime64[s]`, `datetime64[ms]`, and `datetime64[us]`. There are also `timedelta` types, similarly.
@@ -43,22 +39,16 @@ popcon["ctime"] = pd.to_datetime(popcon["ctime"], unit="s")
 
 # TODO: please reimplement this using Polars
 
-# Polars datetime doesn't accept seconds as a param so convert to milliseconds
-popcon_pl = popcon_pl.with_columns([
-    pl.col("atime").mul(1000).alias("atime_ms"),
-    pl.col("ctime").mul(1000).alias("ctime_ms")])
+# `epoch_to_datetime` turns the epoch seconds into a millisecond Datetime in a single expression, without
+# intermediate `_ms` columns. The 0 timestamps are sentinels for "never", so they become null on the way.
+# This is what the catalog did when it loaded the file:
+from cookbook_tools.timestamps import epoch_to_datetime
 
-# # Cast 'atime_ms' and 'ctime_ms' to datetime with unit milliseconds
-popcon_pl = popcon_pl.with_columns([
-    pl.col("atime_ms").cast(pl.Datetime(time_unit="ms")),
-    pl.col("ctime_ms").cast(pl.Datetime(time_unit="ms"))
-])
-
-popcon_pl = popcon_pl.drop(["atime", "ctime"]).rename({
-    "atime_ms": "atime",
-    "ctime_ms": "ctime"
-})
+epoch_seconds = popcon_pl.select(pl.col("atime", "ctime").dt.epoch("s").fill_null(0))
+print(epoch_seconds.select(epoch_to_datetime("atime", unit="s", time_unit="ms")).head(3))
 
+# Without a `unit` the unit is guessed from the size of the numbers, so this gives the same result:
+print(epoch_seconds.select(pl.col("atime").pipe(epoch_to_datetime).alias("guessed")).head(3))
 
 # Display the DataFrame
 print(popcon_pl.head())
@@ -74,6 +64,7 @@ nonlibraries = popcon[~popcon["package-name"].str.contains("lib")]
 nonlibraries.sort_values("ctime", ascending=False)[:10]
 
 # TODO: please reimplement this using Polars
+# In Polars the sentinels are already null, and nulls never pass a comparison, so this filter drops them too.
 popcon_pl = popcon_pl.filter(
     pl.col("atime") > pl.datetime(1970, 1, 1)
 )
@@ -84,10 +75,25 @@ nonlibraries_pl = popcon_pl.filter(
 )
 
 # Sort by 'ctime' in descending order and display the top 10 rows
-nonlibraries_pl = nonlibraries_pl.sort("ctime", descending=True).head(10)
+# We only need 10 rows, so instead of sorting everything we let `top_n` keep the 10 most recent ones.
+from cookbook_tools.topn import top_n, top_n_per_group
+
+nonlibraries_pl = top_n(nonlibraries_pl, 10, by="ctime")
 
 print(nonlibraries_pl)
 
+# %%
+# The same works per group. Here are the 3 most recently changed packages for every popcon tag:
+print(top_n_per_group(popcon_pl, 3, by="ctime", group_by="tag"))
+
+# %%
+# If we wanted all the packages sorted by 'ctime', not just the 10 most recent ones, and there were too many of
+# them to sort in memory, `external_sort` would sort them in runs on disk and stream the merged result to a file.
+from cookbook_tools.external_sort import external_sort
+
+external_sort(popcon_pl.lazy(), "../data/popcon-by-ctime.arrow", by="ctime", descending=True, run_size=1000)
+print(pl.read_ipc("../data/popcon-by-ctime.arrow").head())
+
 # The whole message here is that if you have a timestamp in seconds or milliseconds or nanoseconds, then you can just "cast" it to a `'datetime64[the-right-thing]'` and pandas/numpy will take care of the rest.
 
 # %%
@@ -0,0 +1,44 @@
+"""Reusable Polars helpers for the cookbook chapters.
+
+The chapters are meant to be read top to bottom, so anything that is needed by
+more than one chapter (or is too long to inline in a cell) lives in one of the
+modules of this package. Import the module you need directly, e.g.
+``from cookbook_tools import schema``.
+
+Submodules are only imported when they are first used, and none of them import
+pandas or matplotlib at import time, so ``import cookbook_tools`` is cheap. See
+``cookbook_tools.importtime`` for the import-time budget.
+"""
+
+import importlib
+
+__all__ = [
+    "approx",
+    "catalog",
+    "cube",
+    "dual",
+    "external_sort",
+    "importtime",
+    "incremental",
+    "namespace",
+    "pipelines",
+    "plotting",
+    "quality",
+    "ridership",
+    "rolling",
+    "runner",
+    "schema",
+    "service",
+    "sorted_index",
+    "sorted_parquet",
+    "threads",
+    "timestamps",
+    "topn",
+    "transcode",
+]
+
+
+def __getattr__(name: str):
+    if name in __all__:
+        return importlib.import_module(f"{__name__}.{name}")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
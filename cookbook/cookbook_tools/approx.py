@@ -0,0 +1,179 @@
+"""Approximate medians/quantiles and distinct counts with mergeable sketches.
+
+An exact median needs the whole column and an exact ``n_unique`` needs a hash
+table with every distinct value. The sketches here are small DataFrames that
+can be computed per partition (a file, a month, a worker...), merged by simply
+concatenating them, and queried afterwards:
+
+* ``quantile_sketch`` is a DDSketch: values are counted in logarithmic buckets,
+  so any quantile is estimated within ``relative_accuracy`` of the value at
+  its (lower) rank, ``quantile(q, interpolation="lower")``.
+* ``distinct_sketch`` is a HyperLogLog with ``2**precision`` registers; its
+  relative standard error is about ``1.04 / sqrt(2**precision)``.
+
+Both are computed with native Polars expressions, so they work on DataFrames
+and LazyFrames alike and run in the streaming engine.
+"""
+
+import math
+from collections.abc import Sequence
+
+import polars as pl
+
+Frame = pl.DataFrame | pl.LazyFrame
+
+SEED = 0x5EED
+# Values closer to zero than this all end up in the zero bucket.
+MIN_MAGNITUDE = 1e-9
+
+
+def _as_list(columns: str | Sequence[str] | None) -> list[str]:
+    if columns is None:
+        return []
+    return [columns] if isinstance(columns, str) else list(columns)
+
+
+def _gamma(relative_accuracy: float) -> float:
+    return (1 + relative_accuracy) / (1 - relative_accuracy)
+
+
+def quantile_sketch(
+    frame: Frame,
+    column: str,
+    by: str | Sequence[str] | None = None,
+    relative_accuracy: float = 0.01,
+) -> Frame:
+    """One row per (``by``..., bucket) with the number of values in the bucket."""
+    by = _as_list(by)
+    x = pl.col(column)
+    log_gamma = math.log(_gamma(relative_accuracy))
+    bucket = (x.abs().log() / log_gamma).ceil().cast(pl.Int32)
+    return (
+        frame.select(*by, x)
+        .drop_nulls(column)
+        .filter(x.is_not_nan())
+        .group_by(
+            *by,
+            pl.when(x.abs() < MIN_MAGNITUDE).then(0).otherwise(x.sign()).cast(pl.Int8).alias("sign"),
+            pl.when(x.abs() < MIN_MAGNITUDE).then(0).otherwise(bucket).alias("bucket"),
+        )
+        .agg(pl.len().cast(pl.UInt64).alias("count"))
+    )
+
+
+def merge_quantile_sketches(sketches: Sequence[Frame], by: str | Sequence[str] | None = None) -> Frame:
+    by = _as_list(by)
+    return pl.concat(sketches).group_by(*by, "sign", "bucket").agg(pl.col("count").sum())
+
+
+def sketch_quantile(
+    sketch: Frame,
+    quantile: float,
+    by: str | Sequence[str] | None = None,
+    relative_accuracy: float = 0.01,
+) -> Frame:
+    """Estimate ``quantile`` (0.5 for the median) of every ``by`` group.
+
+    The estimate is within ``relative_accuracy`` of the value at rank
+    ``floor(quantile * (n - 1))``, i.e. ``quantile(q, interpolation="lower")``.
+    There is no interpolation between ranks, so against ``median()`` (which
+    averages the two middle values) the error can be larger.
+    """
+    by = _as_list(by)
+    gamma = _gamma(relative_accuracy)
+    # The midpoint of a bucket (in relative terms) is within relative_accuracy
+    # of every value in it.
+    value = pl.col("sign") * 2 * pl.lit(gamma).pow(pl.col("bucket")) / (gamma + 1)
+    rank = quantile * (pl.col("count").sum() - 1)
+    seen = pl.col("count").cum_sum()
+    if by:
+        seen, rank = seen.over(by), rank.over(by)
+    return (
+        sketch.with_columns(value.alias("value"))
+        .sort(*by, "value")
+        .filter(seen > rank)
+        .group_by(by or pl.lit(0).alias("__all"), maintain_order=True)
+        .agg(pl.col("value").first())
+        .drop("__all", strict=False)
+    )
+
+
+def approx_median(
+    frame: Frame,
+    column: str,
+    by: str | Sequence[str] | None = None,
+    relative_accuracy: float = 0.01,
+) -> Frame:
+    sketch = quantile_sketch(frame, column, by, relative_accuracy)
+    return sketch_quantile(sketch, 0.5, by, relative_accuracy).rename({"value": column})
+
+
+def precision_for(relative_error: float) -> int:
+    """Smallest HyperLogLog precision whose standard error is below ``relative_error``."""
+    return max(4, min(18, math.ceil(2 * math.log2(1.04 / relative_error))))
+
+
+def distinct_sketch(
+    frame: Frame,
+    column: str,
+    by: str | Sequence[str] | None = None,
+    precision: int = 12,
+) -> Frame:
+    """One row per (``by``..., register) with the register's HyperLogLog rank.
+
+    Polars' hash is only stable within one Polars version, so only merge
+    sketches computed with the same version.
+    """
+    by = _as_list(by)
+    h = pl.col(column).hash(SEED)
+    tail_bits = 64 - precision
+    # The first `precision` bits pick the register, the rank is one more than
+    # the number of leading zeros in the remaining bits.
+    register = (h // (1 << tail_bits)).cast(pl.UInt32)
+    rank = (h % (1 << tail_bits)).bitwise_leading_zeros() - precision + 1
+    return (
+        frame.select(*by, column)
+        .drop_nulls(column)
+        .group_by(*by, register.alias("register"))
+        .agg(rank.max().cast(pl.UInt8).alias("rank"))
+    )
+
+
+def merge_distinct_sketches(sketches: Sequence[Frame], by: str | Sequence[str] | None = None) -> Frame:
+    by = _as_list(by)
+    return pl.concat(sketches).group_by(*by, "register").agg(pl.col("rank").max())
+
+
+def sketch_distinct_count(
+    sketch: Frame,
+    by: str | Sequence[str] | None = None,
+    precision: int = 12,
+) -> Frame:
+    """Estimate the number of distinct values of every ``by`` group."""
+    by = _as_list(by)
+    m = 1 << precision
+    alpha = 0.7213 / (1 + 1.079 / m)
+    empty = m - pl.len()
+    # Registers that never got a value have rank 0 and contribute 2**0 = 1.
+    raw = alpha * m * m / ((2.0 ** -pl.col("rank").cast(pl.Float64)).sum() + empty)
+    # Small-range correction: linear counting while many registers are empty.
+    estimate = (
+        pl.when((raw <= 2.5 * m) & (empty > 0))
+        .then(m * (pl.lit(m, pl.Float64) / empty).log())
+        .otherwise(raw)
+    )
+    return (
+        sketch.group_by(by or pl.lit(0).alias("__all"), maintain_order=True)
+        .agg(estimate.round(0).cast(pl.UInt64).alias("n_unique"))
+        .drop("__all", strict=False)
+    )
+
+
+def approx_n_unique(
+    frame: Frame,
+    column: str,
+    by: str | Sequence[str] | None = None,
+    precision: int = 12,
+) -> Frame:
+    sketch = distinct_sketch(frame, column, by, precision)
+    return sketch_distinct_count(sketch, by, precision)
@@ -0,0 +1,147 @@
+"""Load every cookbook dataset once and share it between chapters.
+
+Each chapter used to parse its CSV from scratch. The catalog parses a dataset
+the first time it is asked for, stores the result as an uncompressed Arrow IPC
+file and memory-maps that file on every later read. Memory-mapped files are
+shared through the OS page cache, so any number of threads or worker processes
+can read the same dataset without copying it.
+
+A cached file is reused as long as it is newer than its source file and was
+written by the same version of the loading code: the cache file name includes
+a hash of the module that defines the loader.
+"""
+
+import hashlib
+import inspect
+import os
+import tempfile
+from collections.abc import Callable
+from pathlib import Path
+
+import polars as pl
+
+from cookbook_tools import transcode
+from cookbook_tools.sorted_parquet import csv_to_sorted_parquet, scan_sorted_parquet
+from cookbook_tools.timestamps import epoch_to_datetime
+
+DATA_DIR = Path(__file__).resolve().parents[2] / "data"
+# Part of every cache key. Bump it when a change outside the loaders' module
+# (e.g. in `transcode` or `timestamps`) changes what a loader returns.
+CACHE_VERSION = 1
+
+
+# The strings `pd.read_csv` reads as NaN by default.
+PANDAS_NA_VALUES = [
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+    "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+]  # fmt: skip
+
+
+def load_complaints(data_dir: Path = DATA_DIR) -> pl.LazyFrame:
+    # Every column as a string, like `dtype="unicode"` in Chapters 2, 3 and 7,
+    # with the same missing values as pandas.
+    return pl.scan_csv(
+        data_dir / "311-service-requests.csv", infer_schema_length=0, null_values=PANDAS_NA_VALUES
+    )
+
+
+def load_bikes(data_dir: Path = DATA_DIR) -> pl.LazyFrame:
+    return transcode.scan_csv(
+        data_dir / "bikes.csv", encoding="latin1", separator=";", try_parse_dates=True
+    )
+
+
+def weather_parquet(data_dir: Path = DATA_DIR) -> Path:
+    """``weather_2012.parquet``, made from the shipped CSV if it isn't there yet.
+
+    Chapter 5 writes the weather it downloads into the Parquet file, so that
+    is the copy every reader uses; the CSV is only read to create it.
+    """
+    path = data_dir / "weather_2012.parquet"
+    if (csv := data_dir / "weather_2012.csv").exists():
+        csv_to_sorted_parquet(csv, path, by="date_time", try_parse_dates=True)
+    return path
+
+
+def load_weather(data_dir: Path = DATA_DIR) -> pl.LazyFrame:
+    return scan_sorted_parquet(weather_parquet(data_dir))
+
+
+def load_popcon(data_dir: Path = DATA_DIR) -> pl.LazyFrame:
+    # The first and the last line of the file are not data, see Chapter 8.
+    popcon = pl.read_csv(
+        data_dir / "popularity-contest", separator=" ", infer_schema_length=10000
+    )[:-1]
+    popcon.columns = ["atime", "ctime", "package-name", "mru-program", "tag"]
+    return popcon.lazy().with_columns(
+        epoch_to_datetime(name, unit="s", time_unit="ms").alias(name) for name in ("atime", "ctime")
+    )
+
+
+# Dataset name -> (source file, loader)
+DATASETS: dict[str, tuple[str, Callable[[Path], pl.LazyFrame]]] = {
+    "complaints": ("311-service-requests.csv", load_complaints),
+    "bikes": ("bikes.csv", load_bikes),
+    "weather": ("weather_2012.parquet", load_weather),
+    "popcon": ("popularity-contest", load_popcon),
+}
+
+
+def loader_version(name: str) -> str:
+    """Hash of the code that loads ``name``, which the cache file names include."""
+    loader = DATASETS[name][1]
+    code = f"{CACHE_VERSION}\n{inspect.getsource(inspect.getmodule(loader))}"
+    return hashlib.sha256(code.encode()).hexdigest()[:16]
+
+
+class Catalog:
+    def __init__(self, data_dir: str | Path = DATA_DIR, cache_dir: str | Path | None = None):
+        self.data_dir = Path(data_dir)
+        self.cache_dir = Path(cache_dir) if cache_dir else self.data_dir / ".catalog"
+
+    def source(self, name: str) -> Path:
+        if name == "weather":
+            # Created from the CSV the first time, and up to date after a download.
+            return weather_parquet(self.data_dir)
+        return self.data_dir / DATASETS[name][0]
+
+    def available(self) -> list[str]:
+        """Datasets whose source file is present (the 311 data is not shipped)."""
+        return [name for name in DATASETS if self.source(name).exists()]
+
+    def path(self, name: str) -> Path:
+        return self.cache_dir / f"{name}-{loader_version(name)}.arrow"
+
+    def materialize(self, name: str) -> Path:
+        """Parse ``name`` into the cache, unless the cached copy is up to date."""
+        path = self.path(name)
+        if path.exists() and path.stat().st_mtime >= self.source(name).stat().st_mtime:
+            return path
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        loader = DATASETS[name][1]
+        # Write to a temporary file of our own first: other workers may be
+        # reading `path`, or writing it at the same time.
+        with tempfile.NamedTemporaryFile(
+            dir=self.cache_dir, prefix=f"{path.name}.", suffix=".tmp", delete=False
+        ) as f:
+            tmp = Path(f.name)
+        try:
+            loader(self.data_dir).collect().write_ipc(tmp, compression="uncompressed")
+            os.replace(tmp, path)
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+        # Files written by other versions of the loader are never read again.
+        for stale in self.cache_dir.glob(f"{name}-*.arrow"):
+            if stale != path:
+                stale.unlink(missing_ok=True)
+        return path
+
+    # Polars memory-maps uncompressed IPC files by default, which is why
+    # `materialize` writes them without compression.
+
+    def get(self, name: str) -> pl.DataFrame:
+        return pl.read_ipc(self.materialize(name))
+
+    def scan(self, name: str) -> pl.LazyFrame:
+        return pl.scan_ipc(self.materialize(name))
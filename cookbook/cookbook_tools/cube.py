@@ -0,0 +1,143 @@
+"""Pre-aggregate a time series by (year, month, weekday, hour).
+
+Chapters 4, 5 and 6 slice the same time series by one calendar dimension at a
+time: weekday for the bikes, hour of day and month for the weather. Every one
+of those queries reads all the raw rows. A ``TimeCube`` aggregates the rows once
+into one cell per (year, month, weekday, hour) holding partial aggregates
+(count, sum, min, max, plus a quantile sketch from ``approx``). Any combination
+of the dimensions is then a small ``group_by`` over the cells, and new rows can
+be added by aggregating only them and merging the cells.
+"""
+
+from collections.abc import Sequence
+from pathlib import Path
+
+import polars as pl
+
+from cookbook_tools import approx
+
+DIMENSIONS = ["year", "month", "weekday", "hour"]
+
+
+def _dimensions(time_column: str, dtype: pl.DataType) -> list[pl.Expr]:
+    t = pl.col(time_column)
+    # Daily data (like the bikes) has a Date column, which has no hours.
+    hour = pl.lit(0, pl.Int8) if dtype == pl.Date else t.dt.hour()
+    return [
+        t.dt.year().alias("year"),
+        t.dt.month().alias("month"),
+        (t.dt.weekday() - 1).alias("weekday"),  # 0 = Monday, like pandas
+        hour.alias("hour"),
+    ]
+
+
+class TimeCube:
+    def __init__(
+        self,
+        cells: pl.DataFrame,
+        sketches: dict[str, pl.DataFrame],
+        measures: Sequence[str],
+        relative_accuracy: float = 0.01,
+    ):
+        self.cells = cells
+        self.sketches = sketches
+        self.measures = list(measures)
+        self.relative_accuracy = relative_accuracy
+
+    @classmethod
+    def build(
+        cls,
+        frame: pl.DataFrame | pl.LazyFrame,
+        time_column: str,
+        measures: dict[str, pl.Expr],
+        sketch: Sequence[str] = (),
+        relative_accuracy: float = 0.01,
+    ) -> "TimeCube":
+        """Aggregate ``frame`` into cells.
+
+        ``measures`` maps names to expressions, e.g.
+        ``{"snowing": pl.col("weather").str.contains("Snow")}``; the measures
+        named in ``sketch`` also get a quantile sketch, for medians.
+        """
+        lf = frame.lazy()
+        lf = lf.select(
+            *_dimensions(time_column, lf.collect_schema()[time_column]),
+            *(expr.cast(pl.Float64).alias(name) for name, expr in measures.items()),
+        )
+        aggs = [pl.len().alias("rows")]
+        for name in measures:
+            aggs += [
+                pl.col(name).count().alias(f"{name}_count"),
+                pl.col(name).sum().alias(f"{name}_sum"),
+                pl.col(name).min().alias(f"{name}_min"),
+                pl.col(name).max().alias(f"{name}_max"),
+            ]
+        cells = lf.group_by(DIMENSIONS).agg(aggs).sort(DIMENSIONS).collect()
+        sketches = {
+            name: approx.quantile_sketch(lf, name, DIMENSIONS, relative_accuracy).collect()
+            for name in sketch
+        }
+        return cls(cells, sketches, measures, relative_accuracy)
+
+    def merge(self, other: "TimeCube") -> "TimeCube":
+        """Combine two cubes, e.g. the existing one and one built from new rows."""
+        aggs = [pl.col("rows").sum()]
+        for name in self.measures:
+            aggs += [
+                pl.col(f"{name}_count", f"{name}_sum").sum(),
+                pl.col(f"{name}_min").min(),
+                pl.col(f"{name}_max").max(),
+            ]
+        cells = pl.concat([self.cells, other.cells]).group_by(DIMENSIONS).agg(aggs).sort(DIMENSIONS)
+        sketches = {
+            name: approx.merge_quantile_sketches([sketch, other.sketches[name]], DIMENSIONS)
+            for name, sketch in self.sketches.items()
+        }
+        return TimeCube(cells, sketches, self.measures, self.relative_accuracy)
+
+    def append(self, new_rows: pl.DataFrame | pl.LazyFrame, time_column: str, measures: dict[str, pl.Expr]) -> "TimeCube":
+        """Refresh the cube with rows that were not in it yet."""
+        update = TimeCube.build(new_rows, time_column, measures, list(self.sketches), self.relative_accuracy)
+        return self.merge(update)
+
+    def rollup(self, dimensions: Sequence[str] = ()) -> pl.DataFrame:
+        """count/sum/mean/min/max of every measure, grouped by ``dimensions``."""
+        dimensions = list(dimensions)
+        aggs = [pl.col("rows").sum()]
+        for name in self.measures:
+            aggs += [
+                pl.col(f"{name}_count").sum(),
+                pl.col(f"{name}_sum").sum(),
+                (pl.col(f"{name}_sum").sum() / pl.col(f"{name}_count").sum()).alias(f"{name}_mean"),
+                pl.col(f"{name}_min").min(),
+                pl.col(f"{name}_max").max(),
+            ]
+        if not dimensions:
+            return self.cells.select(aggs)
+        return self.cells.group_by(dimensions).agg(aggs).sort(dimensions)
+
+    def median(self, measure: str, dimensions: Sequence[str] = ()) -> pl.DataFrame:
+        """Approximate median of ``measure``, grouped by ``dimensions``."""
+        dimensions = list(dimensions)
+        sketch = approx.merge_quantile_sketches([self.sketches[measure]], dimensions)
+        result = approx.sketch_quantile(sketch, 0.5, dimensions, self.relative_accuracy)
+        result = result.rename({"value": f"{measure}_median"})
+        return result.sort(dimensions) if dimensions else result
+
+    def save(self, directory: str | Path) -> None:
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        self.cells.write_parquet(directory / "cells.parquet")
+        for name, sketch in self.sketches.items():
+            sketch.write_parquet(directory / f"sketch-{name}.parquet")
+
+    @classmethod
+    def load(cls, directory: str | Path, relative_accuracy: float = 0.01) -> "TimeCube":
+        directory = Path(directory)
+        cells = pl.read_parquet(directory / "cells.parquet")
+        measures = [name.removesuffix("_count") for name in cells.columns if name.endswith("_count")]
+        sketches = {
+            path.stem.removeprefix("sketch-"): pl.read_parquet(path)
+            for path in sorted(directory.glob("sketch-*.parquet"))
+        }
+        return cls(cells, sketches, measures, relative_accuracy)
@@ -0,0 +1,56 @@
+"""Parse a dataset once and get both a Polars and a pandas DataFrame.
+
+The chapters compare pandas and Polars side by side, and used to parse every
+CSV once per library. ``read_both`` parses it once with Polars (through the
+shared ``Catalog``) and hands pandas an Arrow-backed view of the same memory
+(``to_pandas(use_pyarrow_extension_array=True)``), so nothing is parsed or
+copied twice. This needs pandas >= 2.0 and pyarrow.
+"""
+
+import polars as pl
+
+from cookbook_tools.catalog import Catalog
+
+
+def _bikes_to_pandas(df: pl.DataFrame):
+    # Chapters 1 and 4 use `parse_dates=["Date"], dayfirst=True,
+    # index_col="Date"`, and rely on a DatetimeIndex (`.index.weekday`), which
+    # can't be Arrow-backed. Only this one column is converted.
+    import pandas as pd
+
+    # pandas reads the empty "données non disponibles" columns as float NaNs.
+    df = df.with_columns(pl.col(name).cast(pl.Float64) for name in df.columns if df[name].null_count() == df.height)
+    pd_df = df.drop("Date").to_pandas(use_pyarrow_extension_array=True)
+    pd_df.index = pd.DatetimeIndex(df["Date"].cast(pl.Datetime("ns")).to_numpy(), name="Date")
+    return pd_df
+
+
+def _popcon_to_pandas(df: pl.DataFrame):
+    # Chapter 8 teaches `pd.to_datetime(..., unit="s")` on the integers in the
+    # file, so pandas gets the epoch seconds back. The catalog turned the 0
+    # ("never") timestamps into nulls, which become 0 again.
+    times = pl.col("atime", "ctime")
+    return df.with_columns(times.dt.epoch("s").fill_null(0)).to_pandas(use_pyarrow_extension_array=True)
+
+
+# Dataset name -> how to turn the Polars frame into what the pandas cells expect.
+# Everything else is a plain Arrow-backed conversion: the complaints are all
+# strings with pandas' missing values, like `dtype="unicode"`, and weather is
+# not read by any pandas cell.
+PANDAS_CONVERSIONS = {
+    "bikes": _bikes_to_pandas,
+    "popcon": _popcon_to_pandas,
+}
+
+
+def to_pandas(name: str, df: pl.DataFrame):
+    convert = PANDAS_CONVERSIONS.get(name)
+    if convert is not None:
+        return convert(df)
+    return df.to_pandas(use_pyarrow_extension_array=True)
+
+
+def read_both(name: str, catalog: Catalog | None = None):
+    """Return ``(polars_df, pandas_df)`` for a catalog dataset, parsed only once."""
+    df = (catalog or Catalog()).get(name)
+    return df, to_pandas(name, df)
@@ -0,0 +1,140 @@
+"""Sort data that does not fit in memory, and write it out as it is merged.
+
+``df.sort(...)`` needs the whole frame in memory. ``external_sort`` instead
+
+1. reads the input ``run_size`` rows at a time, sorts each run and spills it
+   to disk as an Arrow IPC file,
+2. merges the runs ``block_size`` rows per run at a time (a k-way merge), and
+3. streams the merged blocks into a Parquet, IPC or CSV sink.
+
+So at most about ``run_size`` rows (while spilling) or ``k * block_size`` rows
+(while merging ``k`` runs) are in memory at once. The sort is stable, like
+``pl.DataFrame.sort(..., maintain_order=True)``.
+"""
+
+import shutil
+import tempfile
+from collections.abc import Iterable, Iterator, Sequence
+from pathlib import Path
+
+import polars as pl
+
+ROW_INDEX = "__sort_row"
+RUN_INDEX = "__sort_run"
+
+
+def _batches(source: pl.LazyFrame | Iterable[pl.DataFrame], run_size: int) -> Iterator[pl.DataFrame]:
+    # Regroup whatever batch sizes the source produces into runs of `run_size` rows.
+    batches = source.collect_batches(chunk_size=run_size) if isinstance(source, pl.LazyFrame) else source
+    pending: list[pl.DataFrame] = []
+    pending_rows = 0
+    for batch in batches:
+        pending.append(batch)
+        pending_rows += batch.height
+        while pending_rows >= run_size:
+            run = pl.concat(pending)
+            yield run.head(run_size)
+            pending = [run.slice(run_size)]
+            pending_rows = pending[0].height
+    if pending_rows:
+        yield pl.concat(pending)
+
+
+def _spill_runs(
+    source: pl.LazyFrame | Iterable[pl.DataFrame],
+    by: list[str],
+    descending: list[bool],
+    run_size: int,
+    spill_dir: Path,
+) -> list[Path]:
+    runs = []
+    offset = 0
+    for i, batch in enumerate(_batches(source, run_size)):
+        # The global row number makes every sort key unique, which keeps the
+        # merge stable and lets us find rows again after sorting.
+        run = batch.with_row_index(ROW_INDEX, offset=offset).sort(
+            [*by, ROW_INDEX], descending=[*descending, False], nulls_last=True
+        )
+        offset += batch.height
+        path = spill_dir / f"run-{i:05d}.arrow"
+        run.with_columns(pl.lit(i, pl.UInt32).alias(RUN_INDEX)).write_ipc(path)
+        runs.append(path)
+    return runs
+
+
+def _merge_runs(
+    runs: list[Path], by: list[str], descending: list[bool], block_size: int
+) -> Iterator[pl.DataFrame]:
+    keys, directions = [*by, ROW_INDEX], [*descending, False]
+    heights = [pl.scan_ipc(run).select(pl.len()).collect().item() for run in runs]
+    positions = [0] * len(runs)
+
+    def next_block(i: int) -> pl.DataFrame:
+        block = pl.scan_ipc(runs[i]).slice(positions[i], block_size).collect()
+        positions[i] += block.height
+        return block
+
+    pending = pl.concat([next_block(i) for i in range(len(runs))])
+    while pending.height:
+        # Rows up to the smallest "last buffered row" of the unfinished runs
+        # are final: every row still on disk sorts after that one.
+        unfinished = [i for i in range(len(runs)) if positions[i] < heights[i]]
+        if unfinished:
+            last_rows = pending.filter(pl.col(RUN_INDEX).is_in(unfinished)).group_by(RUN_INDEX).agg(pl.all().last())
+            bound = last_rows.sort(keys, descending=directions, nulls_last=True)[ROW_INDEX][0]
+        else:
+            bound = None
+        pending = pending.sort(keys, descending=directions, nulls_last=True)
+        if bound is None:
+            yield pending.drop(ROW_INDEX, RUN_INDEX)
+            return
+        cut = (pending[ROW_INDEX] == bound).arg_true()[0] + 1
+        yield pending.head(cut).drop(ROW_INDEX, RUN_INDEX)
+        pending = pending.slice(cut)
+        # Refill every unfinished run that has nothing left in memory.
+        still_buffered = set(pending[RUN_INDEX].unique().to_list())
+        refills = [next_block(i) for i in unfinished if i not in still_buffered]
+        pending = pl.concat([pending, *refills])
+
+
+def external_sort(
+    source: pl.LazyFrame | Iterable[pl.DataFrame],
+    path: str | Path,
+    by: str | Sequence[str],
+    descending: bool | Sequence[bool] = False,
+    run_size: int = 1_000_000,
+    block_size: int = 100_000,
+    spill_dir: str | Path | None = None,
+) -> Path:
+    """Sort ``source`` by ``by`` and write the result to ``path``.
+
+    The output format follows the extension of ``path``: ``.parquet``,
+    ``.arrow``/``.ipc`` or ``.csv``. Nulls sort last.
+    """
+    by = [by] if isinstance(by, str) else list(by)
+    descending = [descending] * len(by) if isinstance(descending, bool) else list(descending)
+    path = Path(path)
+    sinks = {
+        ".parquet": pl.LazyFrame.sink_parquet,
+        ".arrow": pl.LazyFrame.sink_ipc,
+        ".ipc": pl.LazyFrame.sink_ipc,
+        ".csv": pl.LazyFrame.sink_csv,
+    }
+    if path.suffix not in sinks:
+        raise ValueError(f"unsupported output format: {path.suffix}")
+
+    work_dir = Path(tempfile.mkdtemp(prefix="external-sort-", dir=spill_dir))
+    try:
+        runs = _spill_runs(source, by, descending, run_size, work_dir)
+        if not runs:
+            raise ValueError("`source` is empty")
+        merged = []
+        for i, block in enumerate(_merge_runs(runs, by, descending, block_size)):
+            merged.append(work_dir / f"merged-{i:05d}.arrow")
+            block.write_ipc(merged[-1])
+        # Scanning the merged blocks in order and sinking them is streaming,
+        # so the full result never needs to be in memory either.
+        sinks[path.suffix](pl.scan_ipc(merged), path)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return path
@@ -0,0 +1,90 @@
+"""Check how long it takes to import the cookbook's entry points.
+
+Short batch jobs pay the import time on every run, so the computational
+entry points must not pull in pandas or matplotlib (those are only imported
+inside the functions that plot or compare with pandas). This runs
+``python -X importtime -c "import <module>"`` in a fresh interpreter, and
+fails when the import takes longer than the budget or loads a forbidden module::
+
+    python -m cookbook_tools.importtime --budget-ms 500
+"""
+
+import argparse
+import subprocess
+import sys
+from dataclasses import dataclass
+
+ENTRY_POINTS = [
+    "cookbook_tools.runner",
+    "cookbook_tools.pipelines",
+    "cookbook_tools.catalog",
+    "cookbook_tools.service",
+]
+FORBIDDEN = ["pandas", "matplotlib", "seaborn"]
+BUDGET_MS = 500.0
+
+
+@dataclass
+class ImportTime:
+    module: str
+    total_ms: float
+    # (module, cumulative ms), slowest first, direct and indirect imports
+    slowest: list[tuple[str, float]]
+    forbidden: list[str]
+
+
+def measure(module: str, forbidden: list[str] = FORBIDDEN) -> ImportTime:
+    """Import ``module`` in a new interpreter and parse the ``-X importtime`` report."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    # Lines look like "import time:   self [us] | cumulative | imported package".
+    timings: dict[str, float] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        timings[name.strip()] = int(cumulative) / 1000
+    loaded = {name.split(".")[0] for name in timings}
+    return ImportTime(
+        module=module,
+        total_ms=timings[module],
+        slowest=sorted(timings.items(), key=lambda item: item[1], reverse=True)[1:6],
+        forbidden=sorted(loaded & set(forbidden)),
+    )
+
+
+def check(modules: list[str] = ENTRY_POINTS, budget_ms: float = BUDGET_MS, repeat: int = 3) -> list[str]:
+    """Return a list of problems (empty when every module is within budget)."""
+    problems = []
+    for module in modules:
+        # The first run may include compiling .pyc files; keep the fastest one.
+        timing = min((measure(module) for _ in range(repeat)), key=lambda t: t.total_ms)
+        print(f"{module}: {timing.total_ms:.0f} ms (budget {budget_ms:.0f} ms)")
+        for name, ms in timing.slowest:
+            print(f"    {name}: {ms:.0f} ms")
+        if timing.total_ms > budget_ms:
+            problems.append(f"{module} takes {timing.total_ms:.0f} ms to import, budget is {budget_ms:.0f} ms")
+        if timing.forbidden:
+            problems.append(f"{module} imports {', '.join(timing.forbidden)}")
+    return problems
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("modules", nargs="*", default=ENTRY_POINTS)
+    parser.add_argument("--budget-ms", type=float, default=BUDGET_MS)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    problems = check(args.modules, args.budget_ms, args.repeat)
+    for problem in problems:
+        print(f"FAIL: {problem}", file=sys.stderr)
+    sys.exit(1 if problems else 0)
+
+
+if __name__ == "__main__":
+    main()
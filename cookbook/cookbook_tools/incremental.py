@@ -0,0 +1,130 @@
+"""Keep the complaint counts of Chapters 2 and 3 up to date as new data arrives.
+
+Instead of re-reading the whole 311 file for every refresh, ``ComplaintCounter``
+remembers how many bytes of every file it has already counted. On each
+``ingest`` it parses only the bytes appended since then (and whole files it
+has not seen before), and adds their counts per (Complaint Type, Borough) to the
+running totals. The totals and the offsets are written to a JSON checkpoint,
+so a restarted process carries on where the previous one stopped.
+
+The input is assumed to be append-only CSV with a header line, and records
+must not contain quoted newlines: we only ever parse up to the last complete
+line, so a record that is still being written is picked up next time.
+"""
+
+import json
+import time
+from collections.abc import Iterator
+from pathlib import Path
+
+import polars as pl
+
+from cookbook_tools.catalog import PANDAS_NA_VALUES
+
+KEYS = ["Complaint Type", "Borough"]
+NOISE_COMPLAINT = "Noise - Street/Sidewalk"
+
+
+class ComplaintCounter:
+    def __init__(self, checkpoint: str | Path):
+        self.checkpoint = Path(checkpoint)
+        self.offsets: dict[str, int] = {}
+        self.headers: dict[str, str] = {}
+        self.counts = pl.DataFrame(schema={"Complaint Type": pl.String, "Borough": pl.String, "count": pl.UInt64})
+        if self.checkpoint.exists():
+            self._load()
+
+    def _load(self) -> None:
+        state = json.loads(self.checkpoint.read_text())
+        self.offsets = state["offsets"]
+        self.headers = state["headers"]
+        self.counts = pl.DataFrame(state["counts"], schema=self.counts.schema, orient="row")
+
+    def save(self) -> None:
+        state = {
+            "offsets": self.offsets,
+            "headers": self.headers,
+            "counts": self.counts.rows(),
+        }
+        tmp = self.checkpoint.with_suffix(".tmp")
+        tmp.write_text(json.dumps(state))
+        tmp.replace(self.checkpoint)
+
+    def _read_new_rows(self, path: Path) -> pl.DataFrame | None:
+        key = str(path.resolve())
+        offset = self.offsets.get(key, 0)
+        size = path.stat().st_size
+        if size < offset:
+            raise ValueError(f"{path} shrank since it was last read, it is not append-only")
+        if size == offset:
+            return None
+        with open(path, "rb") as f:
+            f.seek(offset)
+            new_bytes = f.read(size - offset)
+        # Stop at the last complete line, the rest is read on the next ingest.
+        complete = new_bytes.rfind(b"\n") + 1
+        if complete == 0:
+            return None
+        new_bytes = new_bytes[:complete]
+        if key not in self.headers:
+            header, new_bytes = new_bytes.split(b"\n", 1)
+            self.headers[key] = header.decode()
+        self.offsets[key] = offset + complete
+        if not new_bytes.strip():
+            return None
+        # Put the header back in front, so the columns are found by name.
+        return pl.read_csv(
+            self.headers[key].encode() + b"\n" + new_bytes,
+            columns=KEYS,
+            infer_schema_length=0,
+            null_values=PANDAS_NA_VALUES,  # like the catalog's complaints
+        )
+
+    def ingest(self, *paths: str | Path) -> int:
+        """Count the new rows of ``paths`` (files or directories of ``*.csv``).
+
+        Returns the number of new rows and saves a checkpoint.
+        """
+        files = []
+        for path in map(Path, paths):
+            files.extend(sorted(path.glob("*.csv")) if path.is_dir() else [path])
+
+        new_counts = [self.counts]
+        n_rows = 0
+        for path in files:
+            rows = self._read_new_rows(path)
+            if rows is None:
+                continue
+            n_rows += rows.height
+            new_counts.append(rows.group_by(KEYS).agg(pl.len().cast(pl.UInt64).alias("count")))
+        if n_rows:
+            self.counts = pl.concat(new_counts).group_by(KEYS).agg(pl.col("count").sum()).sort(KEYS)
+        self.save()
+        return n_rows
+
+    def watch(self, *paths: str | Path, interval: float = 5.0) -> Iterator[int]:
+        """Ingest ``paths`` every ``interval`` seconds, yielding the new row counts."""
+        while True:
+            yield self.ingest(*paths)
+            time.sleep(interval)
+
+    def complaint_type_counts(self) -> pl.DataFrame:
+        """Chapter 2: number of complaints per complaint type."""
+        return (
+            self.counts.group_by("Complaint Type")
+            .agg(pl.col("count").sum())
+            .sort("count", "Complaint Type", descending=[True, False])
+        )
+
+    def noise_ratio(self, complaint_type: str = NOISE_COMPLAINT) -> pl.DataFrame:
+        """Chapter 3: share of each borough's complaints that are noise complaints."""
+        return (
+            self.counts.group_by("Borough")
+            .agg(
+                pl.col("count").filter(pl.col("Complaint Type") == complaint_type).sum().alias("noise_count"),
+                pl.col("count").sum().alias("total_count"),
+            )
+            .filter(pl.col("noise_count") > 0)
+            .with_columns((pl.col("noise_count") / pl.col("total_count")).alias("ratio"))
+            .sort("ratio", descending=True)
+        )
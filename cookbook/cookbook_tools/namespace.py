@@ -0,0 +1,83 @@
+"""The cookbook's cleaning steps as a ``.cookbook`` namespace on Polars objects.
+
+Importing this module registers the namespace::
+
+    import cookbook_tools.namespace  # noqa: F401
+
+    df.with_columns(pl.col("Incident Zip").cookbook.fix_zip_codes())
+    df.cookbook.clean_column_names()
+
+Everything is built from native expressions (no ``map_elements``), so the
+steps compose into lazy queries and run in parallel like any other expression.
+"""
+
+from collections.abc import Sequence
+
+import polars as pl
+
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+Weekday = pl.Enum(WEEKDAYS)
+
+# Broken bits in the column names of the Canadian weather downloads (Chapter 5):
+# a byte order mark and UTF-8 text that was decoded as Latin-1.
+COLUMN_NAME_FIXES = {'ï»¿"': " ", "Â": "", ')"': ")"}
+
+
+@pl.api.register_expr_namespace("cookbook")
+class CookbookExpr:
+    def __init__(self, expr: pl.Expr):
+        self._expr = expr
+
+    def fix_zip_codes(self, na_values: Sequence[str] = ()) -> pl.Expr:
+        """Chapter 7: truncate to 5 digits, and make ``00000`` and ``na_values`` null."""
+        zips = self._expr.str.slice(0, 5)
+        is_missing = (zips == "00000") | self._expr.is_in(list(na_values))
+        # `then(zips)` first, so the result keeps the column's name.
+        return pl.when(~is_missing).then(zips)
+
+    def weekday_index(self) -> pl.Expr:
+        """Chapter 4: weekday of a date, 0 for Monday like pandas' ``.weekday``."""
+        return self._expr.dt.weekday() - 1
+
+    def weekday_name(self) -> pl.Expr:
+        """Chapter 4: weekday name of a date, as an Enum so it sorts Monday first."""
+        return self._expr.dt.weekday().replace_strict(
+            dict(enumerate(WEEKDAYS, start=1)), return_dtype=Weekday
+        )
+
+
+def _clean_name(name: str) -> str:
+    for broken, fixed in COLUMN_NAME_FIXES.items():
+        name = name.replace(broken, fixed)
+    return name
+
+
+@pl.api.register_dataframe_namespace("cookbook")
+class CookbookFrame:
+    def __init__(self, df: pl.DataFrame):
+        self._df = df
+
+    def clean_column_names(self) -> pl.DataFrame:
+        """Chapter 5: strip the byte order mark and stray ``Â`` from column names."""
+        return self._df.select(pl.all().name.map(_clean_name))
+
+    def fix_zip_codes(self, column: str = "Incident Zip", na_values: Sequence[str] = ()) -> pl.DataFrame:
+        return self._df.with_columns(pl.col(column).cookbook.fix_zip_codes(na_values))
+
+    def with_weekday(self, column: str = "Date", name: str = "weekday") -> pl.DataFrame:
+        return self._df.with_columns(pl.col(column).cookbook.weekday_name().alias(name))
+
+
+@pl.api.register_lazyframe_namespace("cookbook")
+class CookbookLazyFrame:
+    def __init__(self, lf: pl.LazyFrame):
+        self._lf = lf
+
+    def clean_column_names(self) -> pl.LazyFrame:
+        return self._lf.select(pl.all().name.map(_clean_name))
+
+    def fix_zip_codes(self, column: str = "Incident Zip", na_values: Sequence[str] = ()) -> pl.LazyFrame:
+        return self._lf.with_columns(pl.col(column).cookbook.fix_zip_codes(na_values))
+
+    def with_weekday(self, column: str = "Date", name: str = "weekday") -> pl.LazyFrame:
+        return self._lf.with_columns(pl.col(column).cookbook.weekday_name().alias(name))
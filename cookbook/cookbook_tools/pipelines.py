@@ -0,0 +1,91 @@
+"""The Polars part of every chapter, as plain functions.
+
+Each function takes the LazyFrame(s) it needs (see ``catalog``) and returns a
+LazyFrame, so the chapters, the runner and anything else can reuse the same
+query without copying cells around. Nothing in here imports pandas or
+matplotlib.
+"""
+
+import polars as pl
+
+import cookbook_tools.namespace  # noqa: F401  (registers `.cookbook`)
+from cookbook_tools.topn import top_n
+
+ZIP_NA_VALUES = ["NO CLUE", "N/A", "0"]
+
+
+def top_complaint_types(complaints: pl.LazyFrame, n: int = 10) -> pl.LazyFrame:
+    """Chapter 2: the most common complaint types."""
+    counts = complaints.group_by("Complaint Type").agg(pl.len().alias("count"))
+    return top_n(counts, n, by=["count", "Complaint Type"], descending=[True, False])
+
+
+def noise_ratio_by_borough(
+    complaints: pl.LazyFrame, complaint_type: str = "Noise - Street/Sidewalk"
+) -> pl.LazyFrame:
+    """Chapter 3: share of each borough's complaints that are noise complaints."""
+    return (
+        complaints.group_by("Borough")
+        .agg(
+            (pl.col("Complaint Type") == complaint_type).sum().alias("noise_count"),
+            pl.len().alias("total_count"),
+        )
+        .filter(pl.col("noise_count") > 0)
+        .with_columns((pl.col("noise_count") / pl.col("total_count")).alias("ratio"))
+        .sort("ratio", descending=True)
+    )
+
+
+def weekday_bike_totals(bikes: pl.LazyFrame, column: str = "Berri 1") -> pl.LazyFrame:
+    """Chapter 4: total cyclists per weekday on one bike path."""
+    return (
+        bikes.group_by(pl.col("Date").cookbook.weekday_name().alias("weekday"))
+        .agg(pl.col(column).sum().alias("total_cyclists"))
+        .sort("weekday")
+    )
+
+
+def hourly_temperature_medians(weather: pl.LazyFrame) -> pl.LazyFrame:
+    """Chapter 5: median temperature per hour of the day."""
+    return (
+        weather.group_by(pl.col("date_time").dt.hour().alias("hour"))
+        .agg(pl.col("temperature_c").median())
+        .sort("hour")
+    )
+
+
+def monthly_median_temperature(weather: pl.LazyFrame) -> pl.LazyFrame:
+    """Chapter 6: median temperature per month."""
+    return (
+        weather.group_by(pl.col("date_time").dt.month().alias("month"))
+        .agg(pl.col("temperature_c").median())
+        .sort("month")
+    )
+
+
+def monthly_snow_share(weather: pl.LazyFrame) -> pl.LazyFrame:
+    """Chapter 6: fraction of the hours it was snowing, per month."""
+    return (
+        weather.group_by(pl.col("date_time").dt.month().alias("month"))
+        .agg(pl.col("weather").str.contains("Snow").mean().alias("snow_percentage"))
+        .sort("month")
+    )
+
+
+def far_zip_requests(complaints: pl.LazyFrame) -> pl.LazyFrame:
+    """Chapter 7: requests whose (cleaned) zip code is far away from New York."""
+    zips = pl.col("Incident Zip")
+    return (
+        complaints.cookbook.fix_zip_codes("Incident Zip", na_values=ZIP_NA_VALUES)
+        .filter(zips.is_not_null() & ~zips.str.starts_with("0") & ~zips.str.starts_with("1"))
+        .select("Incident Zip", "Descriptor", "City")
+        .sort("Incident Zip")
+    )
+
+
+def recent_nonlibraries(popcon: pl.LazyFrame, n: int = 10) -> pl.LazyFrame:
+    """Chapter 8: the most recently changed packages that aren't libraries."""
+    nonlibraries = popcon.filter(pl.col("atime") > pl.datetime(1970, 1, 1)).filter(
+        ~pl.col("package-name").str.contains("lib")
+    )
+    return top_n(nonlibraries, n, by="ctime")
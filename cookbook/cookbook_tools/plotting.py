@@ -0,0 +1,25 @@
+"""Plot Polars results with the cookbook's matplotlib style.
+
+matplotlib is imported the first time something is plotted, not when this
+module is imported, and the style is applied with a context manager instead of
+changing the global ``plt.rcParams`` the way the chapters' preambles do.
+"""
+
+import polars as pl
+
+STYLE = "ggplot"
+RC_PARAMS = {"figure.figsize": (15, 5), "font.family": "sans-serif"}
+
+
+def bar(df: pl.DataFrame, x: str, y: str, title: str = "", rotation: int = 45):
+    import matplotlib.pyplot as plt
+
+    with plt.style.context(STYLE), plt.rc_context(RC_PARAMS):
+        fig, ax = plt.subplots()
+        ax.bar(df[x].cast(pl.String).to_list(), df[y].to_list())
+        ax.set_title(title)
+        ax.set_xlabel(x)
+        ax.set_ylabel(y)
+        ax.tick_params(axis="x", labelrotation=rotation)
+        fig.tight_layout()
+    return fig
@@ -0,0 +1,80 @@
+"""Profile messy columns in a single pass.
+
+Chapter 7 discovers what is wrong with the zip codes one query at a time:
+``unique()``, then the values with a dash, then the long ones, then the
+``00000`` ones, and so on, and each query reads the column again.
+``profile_columns`` computes all of these in one lazy ``select``, so the data
+is scanned once, and returns one report row per column.
+"""
+
+from collections.abc import Sequence
+
+import polars as pl
+
+NA_VALUES = ["", "N/A", "NA", "NO CLUE", "0"]
+PATTERNS = {
+    "digits_only": r"^\d+$",
+    "has_dash": r"-",
+    "all_zeros": r"^0+$",
+}
+SEP = "\x1f"  # joins column and statistic names in the intermediate result
+
+
+def _column_stats(
+    name: str,
+    na_values: Sequence[str],
+    patterns: dict[str, str],
+    top_k: int,
+) -> list[pl.Expr]:
+    # Everything is looked at as text, like `dtype="unicode"` in pandas.
+    text = pl.col(name).cast(pl.String)
+    stats = {
+        "null_count": text.null_count(),
+        "na_count": text.is_in(list(na_values)).sum(),
+        "n_unique": text.n_unique(),
+        **{pattern: text.str.contains(regex).sum() for pattern, regex in patterns.items()},
+        "lengths": text.str.len_chars()
+        .drop_nulls()
+        .value_counts(sort=True)
+        .struct.rename_fields(["length", "count"])
+        .implode(),
+        "top_values": text.drop_nulls()
+        .value_counts(sort=True)
+        .head(top_k)
+        .struct.rename_fields(["value", "count"])
+        .implode(),
+    }
+    return [expr.alias(f"{name}{SEP}{stat}") for stat, expr in stats.items()]
+
+
+def profile_columns(
+    frame: pl.DataFrame | pl.LazyFrame,
+    columns: Sequence[str] | None = None,
+    na_values: Sequence[str] = NA_VALUES,
+    patterns: dict[str, str] | None = None,
+    top_k: int = 5,
+) -> pl.DataFrame:
+    """One row per column: null and NA-sentinel counts, distinct count (null
+    counts as a value, like ``unique()``), counts per ``patterns`` (regex)
+    class, a histogram of value lengths and the ``top_k`` most common values.
+
+    Profile the raw text: if ``frame`` was read with ``null_values``, the NA
+    sentinels it lists are already null and won't show up in ``na_count``.
+    """
+    lf = frame.lazy()
+    columns = list(columns or lf.collect_schema().names())
+    patterns = PATTERNS if patterns is None else patterns
+    row = (
+        lf.select(
+            pl.len().alias("rows"),
+            *(expr for name in columns for expr in _column_stats(name, na_values, patterns, top_k)),
+        )
+        .collect()
+        .row(0, named=True)
+    )
+
+    report = []
+    for name in columns:
+        stats = {key.split(SEP, 1)[1]: value for key, value in row.items() if key.startswith(f"{name}{SEP}")}
+        report.append({"column": name, "rows": row["rows"], **stats})
+    return pl.DataFrame(report)
@@ -0,0 +1,92 @@
+"""Join the daily bike counts (Chapter 4) with the weather (Chapters 5-6).
+
+The weather is hourly and the bike counts are daily, so the weather is first
+rolled up per station and day with ``group_by_dynamic``, and the two are then
+matched with a single ``join_asof`` on the date, by station. The bike counts
+are turned into one row per day and counter first, with the counters of a day
+next to each other so the rows stay in date order, and every counter gets the
+name of the station that covers it. Both steps need their input sorted by
+time within each station, and give wrong results rather than an error if it
+isn't, so inputs are sorted first unless they are DataFrames that already are
+(like the hourly weather and the daily bike counts). The daily rollup comes
+out sorted within each station, and so does the long bike table. Both steps
+partition by station name, which only has a handful of values.
+"""
+
+import polars as pl
+
+Frame = pl.DataFrame | pl.LazyFrame
+
+DEFAULT_STATION = "MONTREAL/PIERRE ELLIOTT TRUDEAU INTL A"
+
+
+def _sorted(frame: Frame, by: list[str]) -> Frame:
+    # `frame` sorted by `by`: as is if it is a DataFrame that already is,
+    # since checking is cheaper than sorting.
+    if isinstance(frame, pl.DataFrame) and frame.select(pl.struct(by).is_sorted()).item():
+        return frame
+    return frame.sort(by, maintain_order=True)
+
+
+def daily_weather(weather: Frame) -> Frame:
+    """One row per station and day, with the day's temperature, wind and precipitation."""
+    return (
+        _sorted(weather, ["station_name", "date_time"])
+        .group_by_dynamic("date_time", every="1d", group_by="station_name")
+        .agg(
+            pl.col("temperature_c").mean().alias("temperature_mean"),
+            pl.col("temperature_c").min().alias("temperature_min"),
+            pl.col("temperature_c").max().alias("temperature_max"),
+            pl.col("relative_humidity").mean().alias("humidity_mean"),
+            pl.col("wind_speed_kmh").mean().alias("wind_speed_mean"),
+            pl.col("weather").str.contains("Snow").sum().alias("snow_hours"),
+            pl.col("weather").str.contains("Rain|Drizzle|Thunderstorms").sum().alias("rain_hours"),
+        )
+        .with_columns(pl.col("date_time").dt.date().alias("date"))
+        .drop("date_time")
+    )
+
+
+def ridership_weather(
+    bikes: Frame,
+    weather: Frame,
+    stations: dict[str, list[str]] | None = None,
+    tolerance: str = "1d",
+) -> Frame:
+    """One row per counter and day: the number of cyclists and that day's weather.
+
+    ``stations`` maps a weather station to the bike counters it covers; by
+    default every counter uses the Montréal airport station. A day without
+    weather takes the previous day's, at most ``tolerance`` earlier.
+    """
+    schema = bikes.collect_schema() if isinstance(bikes, pl.LazyFrame) else bikes.schema
+    if stations is None:
+        stations = {DEFAULT_STATION: [name for name, dtype in schema.items() if dtype.is_numeric()]}
+    covered_by = {counter: station for station, counters in stations.items() for counter in counters}
+    counters = list(covered_by)
+
+    daily = daily_weather(weather.filter(pl.col("station_name").is_in(list(stations))))
+    weather_columns = [name for name in daily.collect_schema().names() if name != "date"]
+    # One row per day and counter, in date order (unlike `unpivot`, which
+    # puts each counter's rows after the previous counter's).
+    return (
+        _sorted(bikes, ["Date"])
+        .select(
+            "Date",
+            pl.lit(counters).alias("counter"),
+            pl.concat_list(counters).alias("cyclists"),
+        )
+        .explode("counter", "cyclists")
+        .with_columns(pl.col("counter").replace_strict(covered_by, return_dtype=pl.String).alias("station_name"))
+        .join_asof(
+            daily,
+            left_on="Date",
+            right_on="date",
+            by="station_name",
+            strategy="backward",
+            tolerance=tolerance,
+            # Polars can't check this with `by`; `_sorted` made sure of it above.
+            check_sortedness=False,
+        )
+        .select("counter", "Date", "cyclists", *weather_columns)
+    )
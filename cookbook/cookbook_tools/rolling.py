@@ -0,0 +1,200 @@
+"""Rolling 24h/7d statistics per station, updated incrementally.
+
+Chapters 5 and 6 summarize the weather with one median per hour or month.
+``RollingStats`` computes, for every hour of every station, the mean, min and
+max of each measure over the trailing windows (``(t - 24h, t]`` and
+``(t - 7d, t]``) and the number of consecutive snowing hours ending at that
+hour, using ``rolling_*_by`` over ``date_time`` partitioned by station.
+
+State is kept per station: the measured rows of the longest window before the
+station's latest hour, which is all the context a new hour needs, and the
+statistics computed so far. ``append`` only touches the stations that have new
+rows, recomputes their hours from the earliest new one onwards, and splices
+those onto the end of the station's statistics. Rows for an hour that is
+already there replace the old one, as long as the hour is within ``lateness``
+of the station's latest hour (older rows are no longer kept). ``rolling_stats``
+recomputes everything from scratch, which is what ``append`` is checked
+against.
+"""
+
+from collections.abc import Sequence
+
+import polars as pl
+
+WINDOWS = ["24h", "7d"]
+MEASURES = {
+    "temperature_c": pl.col("temperature_c"),
+    "relative_humidity": pl.col("relative_humidity"),
+}
+SNOWING = pl.col("weather").str.contains("Snow")
+
+
+def _prepare(
+    frame: pl.DataFrame | pl.LazyFrame,
+    time_column: str,
+    by: str,
+    measures: dict[str, pl.Expr],
+    snowing: pl.Expr,
+) -> pl.DataFrame:
+    # One row per (station, hour), the last one wins, sorted by (station, hour).
+    return (
+        frame.lazy()
+        .select(
+            time_column,
+            pl.col(by).cast(pl.String),
+            *(expr.cast(pl.Float64).alias(name) for name, expr in measures.items()),
+            snowing.fill_null(False).alias("snowing"),
+        )
+        .drop_nulls([time_column, by])
+        .unique([by, time_column], keep="last", maintain_order=True)
+        .sort(by, time_column)
+        .collect()
+    )
+
+
+def _windows(
+    rows: pl.DataFrame, time_column: str, by: str, measures: Sequence[str], windows: Sequence[str]
+) -> pl.DataFrame:
+    exprs = []
+    for window in windows:
+        for name in measures:
+            column = pl.col(name)
+            exprs += [
+                column.rolling_mean_by(time_column, window).over(by).alias(f"{name}_mean_{window}"),
+                column.rolling_min_by(time_column, window).over(by).alias(f"{name}_min_{window}"),
+                column.rolling_max_by(time_column, window).over(by).alias(f"{name}_max_{window}"),
+            ]
+    return rows.select(by, time_column, *exprs)
+
+
+def _streaks(rows: pl.DataFrame, time_column: str, by: str, carry: pl.DataFrame) -> pl.DataFrame:
+    # Every dry hour starts a new run, and the streak is the number of snowing
+    # hours so far in the run. The first run of each station continues the
+    # streak in ``carry`` (the one running just before ``rows`` start).
+    run = (~pl.col("snowing")).cum_sum().over(by)
+    streak = pl.col("snowing").cast(pl.Int32).cum_sum().over(by, run)
+    streak = pl.when(run == 0).then(streak + pl.col("carry").fill_null(0)).otherwise(streak)
+    return rows.join(carry, on=by, how="left", maintain_order="left").select(
+        by, time_column, streak.alias("snow_streak_hours")
+    )
+
+
+def _statistics(
+    rows: pl.DataFrame,
+    time_column: str,
+    by: str,
+    measures: Sequence[str],
+    windows: Sequence[str],
+    carry: pl.DataFrame,
+) -> pl.DataFrame:
+    return _windows(rows, time_column, by, measures, windows).with_columns(
+        _streaks(rows, time_column, by, carry)["snow_streak_hours"]
+    )
+
+
+def _no_carry(by: str) -> pl.DataFrame:
+    return pl.DataFrame(schema={by: pl.String, "carry": pl.Int32})
+
+
+class RollingStats:
+    def __init__(
+        self,
+        time_column: str = "date_time",
+        by: str = "station_name",
+        measures: dict[str, pl.Expr] = MEASURES,
+        snowing: pl.Expr = SNOWING,
+        windows: Sequence[str] = WINDOWS,
+        lateness: str = "0h",
+    ):
+        self.time_column = time_column
+        self.by = by
+        self.measures = dict(measures)
+        self.snowing = snowing
+        self.windows = list(windows)
+        self.lateness = lateness
+        # Station -> its retained rows / its statistics, sorted by time.
+        self._rows: dict[str, pl.DataFrame] = {}
+        self._stats: dict[str, pl.DataFrame] = {}
+
+    @classmethod
+    def build(
+        cls,
+        frame: pl.DataFrame | pl.LazyFrame,
+        time_column: str = "date_time",
+        by: str = "station_name",
+        measures: dict[str, pl.Expr] = MEASURES,
+        snowing: pl.Expr = SNOWING,
+        windows: Sequence[str] = WINDOWS,
+        lateness: str = "0h",
+    ) -> "RollingStats":
+        """Compute the statistics of every row of ``frame``."""
+        return cls(time_column, by, measures, snowing, windows, lateness).append(frame)
+
+    @property
+    def stats(self) -> pl.DataFrame:
+        """The statistics of every station, sorted by (station, time)."""
+        if not self._stats:
+            return pl.DataFrame()
+        return pl.concat([self._stats[station] for station in sorted(self._stats)]).rechunk()
+
+    def _window_start(self, moment: pl.Expr) -> pl.Expr:
+        return pl.min_horizontal(moment.dt.offset_by(f"-{window}") for window in self.windows)
+
+    def append(self, new_rows: pl.DataFrame | pl.LazyFrame) -> "RollingStats":
+        """Add ``new_rows``, recompute the hours whose windows they touch, and return ``self``."""
+        t, by = self.time_column, self.by
+        new = _prepare(new_rows, t, by, self.measures, self.snowing)
+        if new.is_empty():
+            return self
+        cutoffs = dict(new.group_by(by).agg(pl.col(t).min()).iter_rows())
+        # Position of each cutoff in the station's statistics: everything
+        # before it stays, everything from it on is recomputed.
+        splits, carry, context = {}, [], []
+        for station, cutoff in cutoffs.items():
+            if station not in self._stats:
+                splits[station] = 0
+                continue
+            stats = self._stats[station]
+            latest = stats[t][-1]
+            if cutoff < pl.select(pl.lit(latest).dt.offset_by(f"-{self.lateness}")).item():
+                raise ValueError(f"{station}: {cutoff} is more than {self.lateness} before {latest}")
+            splits[station] = stats[t].search_sorted(cutoff, "left")
+            if splits[station] > 0:
+                carry.append((station, stats["snow_streak_hours"][splits[station] - 1]))
+            context.append(self._rows[station])
+
+        # The new rows come last, so they win over retained rows for the same hour.
+        rows = pl.concat([*context, new]).unique([by, t], keep="last", maintain_order=True).sort(by, t)
+        bounds = pl.DataFrame(
+            list(cutoffs.items()), schema={by: pl.String, "cutoff": rows.schema[t]}, orient="row"
+        )
+        with_cutoff = rows.join(bounds, on=by, maintain_order="left")
+        affected = with_cutoff[t] >= with_cutoff["cutoff"]
+        carry = pl.DataFrame(carry, schema={by: pl.String, "carry": pl.Int32}, orient="row")
+        updated = (
+            _windows(rows, t, by, list(self.measures), self.windows)
+            .filter(affected)
+            .with_columns(_streaks(rows.filter(affected), t, by, carry)["snow_streak_hours"])
+        )
+        for (station,), tail in updated.partition_by(by, as_dict=True, maintain_order=True).items():
+            head = self._stats[station].head(splits[station]) if station in self._stats else None
+            self._stats[station] = tail if head is None or head.is_empty() else pl.concat([head, tail])
+
+        # Keep only what the next append can need as context.
+        keep = pl.col(t) > self._window_start(pl.col(t).max()).dt.offset_by(f"-{self.lateness}").over(by)
+        for (station,), retained in rows.filter(keep).partition_by(by, as_dict=True).items():
+            self._rows[station] = retained
+        return self
+
+
+def rolling_stats(
+    frame: pl.DataFrame | pl.LazyFrame,
+    time_column: str = "date_time",
+    by: str = "station_name",
+    measures: dict[str, pl.Expr] = MEASURES,
+    snowing: pl.Expr = SNOWING,
+    windows: Sequence[str] = WINDOWS,
+) -> pl.DataFrame:
+    """The statistics of every row of ``frame``, computed from scratch."""
+    rows = _prepare(frame, time_column, by, measures, snowing)
+    return _statistics(rows, time_column, by, list(measures), windows, _no_carry(by))
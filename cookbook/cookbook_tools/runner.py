@@ -0,0 +1,212 @@
+"""Run all chapter pipelines at once, sharing one data catalog.
+
+The chapters form a small DAG: every pipeline depends on the dataset(s) it
+reads, and the datasets do not depend on anything. We load every dataset once
+into the ``Catalog`` (an Arrow IPC file per dataset), then run the pipelines in
+a thread or process pool as soon as their inputs are ready. Workers memory-map
+the catalog files instead of receiving copies.
+
+With ``--executor subprocess`` every pipeline runs in its own interpreter with
+the Polars thread budget from ``--thread-budgets`` (see ``threads``), so
+several pipelines running at once don't fight over the same cores.
+
+Run it from the ``cookbook`` folder::
+
+    python -m cookbook_tools.runner --executor process --workers 4
+"""
+
+import argparse
+import time
+from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED, Executor, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+
+import polars as pl
+
+from cookbook_tools import pipelines, ridership, threads
+from cookbook_tools.catalog import DATA_DIR, Catalog
+
+# Pipeline name -> (function, datasets it reads)
+CHAPTERS: dict[str, tuple[Callable[..., pl.LazyFrame], list[str]]] = {
+    "chapter2_top_complaint_types": (pipelines.top_complaint_types, ["complaints"]),
+    "chapter3_noise_ratio_by_borough": (pipelines.noise_ratio_by_borough, ["complaints"]),
+    "chapter4_weekday_bike_totals": (pipelines.weekday_bike_totals, ["bikes"]),
+    "chapter4_ridership_weather": (ridership.ridership_weather, ["bikes", "weather"]),
+    "chapter5_hourly_temperature_medians": (pipelines.hourly_temperature_medians, ["weather"]),
+    "chapter6_monthly_median_temperature": (pipelines.monthly_median_temperature, ["weather"]),
+    "chapter6_monthly_snow_share": (pipelines.monthly_snow_share, ["weather"]),
+    "chapter7_far_zip_requests": (pipelines.far_zip_requests, ["complaints"]),
+    "chapter8_recent_nonlibraries": (pipelines.recent_nonlibraries, ["popcon"]),
+}
+
+
+# Pipeline name -> (x, y) columns to plot with `--plot`
+PLOTS: dict[str, tuple[str, str]] = {
+    "chapter2_top_complaint_types": ("Complaint Type", "count"),
+    "chapter3_noise_ratio_by_borough": ("Borough", "ratio"),
+    "chapter4_weekday_bike_totals": ("weekday", "total_cyclists"),
+    "chapter5_hourly_temperature_medians": ("hour", "temperature_c"),
+    "chapter6_monthly_median_temperature": ("month", "temperature_c"),
+    "chapter6_monthly_snow_share": ("month", "snow_percentage"),
+}
+
+
+@dataclass
+class Task:
+    name: str
+    deps: list[str] = field(default_factory=list)
+    start: float = 0.0
+    end: float = 0.0
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+# The two functions below run inside the workers, so they have to be
+# importable (picklable) module-level functions for the process pool.
+
+
+def _load_dataset(catalog: Catalog, name: str) -> tuple[float, float, None]:
+    start = time.perf_counter()
+    catalog.materialize(name)
+    return start, time.perf_counter(), None
+
+
+def _run_chapter(catalog: Catalog, name: str) -> tuple[float, float, pl.DataFrame]:
+    start = time.perf_counter()
+    func, datasets = CHAPTERS[name]
+    result = func(*(catalog.scan(dataset) for dataset in datasets)).collect()
+    return start, time.perf_counter(), result
+
+
+def _run_chapter_subprocess(
+    catalog: Catalog, name: str, budget: int | None
+) -> tuple[float, float, pl.DataFrame]:
+    start = time.perf_counter()
+    _, result = threads.run_in_subprocess(name, budget, catalog.data_dir)
+    return start, time.perf_counter(), result
+
+
+def build_dag(catalog: Catalog, chapters: list[str] | None = None) -> dict[str, Task]:
+    """One task per dataset and one per chapter, skipping chapters without data."""
+    available = set(catalog.available())
+    tasks = {}
+    for name in chapters or CHAPTERS:
+        datasets = CHAPTERS[name][1]
+        if not set(datasets) <= available:
+            continue
+        for dataset in datasets:
+            tasks.setdefault(f"load:{dataset}", Task(f"load:{dataset}"))
+        tasks[name] = Task(name, deps=[f"load:{dataset}" for dataset in datasets])
+    return tasks
+
+
+def critical_path(tasks: dict[str, Task]) -> tuple[list[str], float]:
+    """The chain of dependent tasks with the largest total duration."""
+    best: dict[str, tuple[float, list[str]]] = {}
+
+    def longest(name: str) -> tuple[float, list[str]]:
+        if name not in best:
+            task = tasks[name]
+            before = max((longest(dep) for dep in task.deps), default=(0.0, []))
+            best[name] = (before[0] + task.duration, before[1] + [name])
+        return best[name]
+
+    total, path = max(longest(name) for name in tasks)
+    return path, total
+
+
+def run(
+    catalog: Catalog | None = None,
+    chapters: list[str] | None = None,
+    executor: str = "thread",
+    workers: int | None = None,
+    thread_budgets: dict[str, int] | None = None,
+) -> tuple[dict[str, pl.DataFrame], dict[str, Task]]:
+    """Execute the DAG, starting every task as soon as its dependencies are done."""
+    catalog = catalog or Catalog()
+    tasks = build_dag(catalog, chapters)
+    pool_cls: type[Executor] = ProcessPoolExecutor if executor == "process" else ThreadPoolExecutor
+    thread_budgets = thread_budgets or {}
+
+    results: dict[str, pl.DataFrame] = {}
+    done: set[str] = set()
+    origin = time.perf_counter()
+    with pool_cls(max_workers=workers) as pool:
+        running = {}
+        while len(done) < len(tasks):
+            for task in tasks.values():
+                if task.name in done or task.name in running.values():
+                    continue
+                if all(dep in done for dep in task.deps):
+                    if task.name.startswith("load:"):
+                        future = pool.submit(_load_dataset, catalog, task.name.removeprefix("load:"))
+                    elif executor == "subprocess":
+                        budget = threads.budget_for(task.name, thread_budgets)
+                        future = pool.submit(_run_chapter_subprocess, catalog, task.name, budget)
+                    else:
+                        future = pool.submit(_run_chapter, catalog, task.name)
+                    running[future] = task.name
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                start, end, result = future.result()
+                # perf_counter is not comparable across processes, so keep
+                # the duration measured by the worker and place it at "now".
+                tasks[name].end = time.perf_counter() - origin
+                tasks[name].start = tasks[name].end - (end - start)
+                if result is not None:
+                    results[name] = result
+                done.add(name)
+    return results, tasks
+
+
+def report(tasks: dict[str, Task]) -> str:
+    lines = [f"{'task':<40} {'start':>8} {'end':>8} {'seconds':>8}"]
+    for task in sorted(tasks.values(), key=lambda task: task.start):
+        lines.append(f"{task.name:<40} {task.start:>8.3f} {task.end:>8.3f} {task.duration:>8.3f}")
+    path, total = critical_path(tasks)
+    wall = max(task.end for task in tasks.values())
+    lines.append(f"\nwall time: {wall:.3f}s, sum of tasks: {sum(t.duration for t in tasks.values()):.3f}s")
+    lines.append(f"critical path ({total:.3f}s): {' -> '.join(path)}")
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("chapters", nargs="*", help=f"default: all of {', '.join(CHAPTERS)}")
+    parser.add_argument("--executor", choices=["thread", "process", "subprocess"], default="thread")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    parser.add_argument(
+        "--thread-budgets",
+        default=None,
+        help=f"JSON file of Polars threads per pipeline (default: ${threads.BUDGETS_ENV})",
+    )
+    parser.add_argument("--plot", action="store_true", help="plot the results (imports matplotlib)")
+    args = parser.parse_args()
+    if unknown := set(args.chapters) - set(CHAPTERS):
+        parser.error(f"unknown chapters: {', '.join(sorted(unknown))}")
+
+    budgets = threads.load_budgets(args.thread_budgets)
+    results, tasks = run(Catalog(args.data_dir), args.chapters or None, args.executor, args.workers, budgets)
+    for name, result in results.items():
+        print(f"\n{name}\n{result}")
+    print()
+    print(report(tasks))
+
+    if args.plot:
+        # Only now do we pay for importing matplotlib.
+        import matplotlib.pyplot as plt
+
+        from cookbook_tools import plotting
+
+        for name, result in results.items():
+            if name in PLOTS:
+                plotting.bar(result, *PLOTS[name], title=name)
+        plt.show()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Pick the narrowest safe dtypes for a dataset and remember them.
+
+Polars infers ``Int64``/``Float64``/``String`` for everything it reads from a
+CSV. That is safe, but wasteful: a hourly temperature never needs 64 bits and
+``station_name`` is the same string on every row. ``optimize_schema`` profiles
+a frame once and returns a schema that can be saved with ``save_schema`` and
+reused for every later ``read_csv``/``scan_csv`` of the same data.
+"""
+
+from pathlib import Path
+
+import polars as pl
+import polars.selectors as cs
+
+INTEGER_RANGES = {
+    pl.Int8: (-(2**7), 2**7 - 1),
+    pl.Int16: (-(2**15), 2**15 - 1),
+    pl.Int32: (-(2**31), 2**31 - 1),
+}
+UNSIGNED_RANGES = {
+    pl.UInt8: (0, 2**8 - 1),
+    pl.UInt16: (0, 2**16 - 1),
+    pl.UInt32: (0, 2**32 - 1),
+}
+
+# Float32 has a 24 bit mantissa, so any value with `decimals` digits after the
+# point survives the round trip as long as value * 10**decimals stays below this.
+FLOAT32_EXACT_LIMIT = 2**24
+
+
+def _smallest_int_type(lo: int, hi: int) -> pl.DataType:
+    candidates = UNSIGNED_RANGES if lo >= 0 else INTEGER_RANGES
+    for dtype, (type_min, type_max) in candidates.items():
+        if type_min <= lo and hi <= type_max:
+            return dtype
+    return pl.Int64
+
+
+def _float_decimals(series: pl.Series, max_decimals: int) -> int | None:
+    # Smallest number of decimals that represents every value exactly, or None
+    # when the column needs more precision than we are willing to check for.
+    values = series.drop_nulls().drop_nans()
+    for decimals in range(max_decimals + 1):
+        scaled = values * 10**decimals
+        if ((scaled - scaled.round(0)).abs() < 1e-6).all():
+            return decimals
+    return None
+
+
+def optimize_schema(
+    df: pl.DataFrame,
+    max_categories: int = 256,
+    max_decimals: int = 3,
+    enums: bool = False,
+) -> dict[str, pl.DataType]:
+    """Return the narrowest dtype for every column of ``df`` that keeps its values.
+
+    * integer columns are downcast to the smallest (unsigned if possible) type
+      that holds their min and max
+    * float columns become ``Float32`` when every value has at most
+      ``max_decimals`` decimals and fits in the Float32 mantissa
+    * string columns with at most ``max_categories`` distinct values become
+      ``Categorical``, or an ``Enum`` of exactly those values with
+      ``enums=True``. An ``Enum`` is smaller and faster, but reading a value
+      that is not one of its categories fails, so only use it for a schema
+      that won't be reused on new data.
+    * constant columns (a single value, or only nulls) are reported by
+      ``constant_columns`` and are otherwise treated like any other column
+    """
+    stats = df.select(
+        pl.all().n_unique().name.suffix("__n_unique"),
+        cs.numeric().min().name.suffix("__min"),
+        cs.numeric().max().name.suffix("__max"),
+    ).row(0, named=True)
+
+    schema = {}
+    for name, dtype in df.schema.items():
+        if dtype.is_integer():
+            lo, hi = stats[f"{name}__min"], stats[f"{name}__max"]
+            schema[name] = dtype if lo is None else _smallest_int_type(lo, hi)
+        elif dtype.is_float():
+            decimals = _float_decimals(df[name], max_decimals)
+            hi = max(abs(stats[f"{name}__min"] or 0), abs(stats[f"{name}__max"] or 0))
+            fits = decimals is not None and hi * 10**decimals < FLOAT32_EXACT_LIMIT
+            schema[name] = pl.Float32 if fits else dtype
+        elif dtype == pl.String and stats[f"{name}__n_unique"] <= max_categories:
+            categories = df[name].drop_nulls().unique().sort()
+            if not len(categories):
+                schema[name] = dtype
+            else:
+                schema[name] = pl.Enum(categories) if enums else pl.Categorical()
+        else:
+            schema[name] = dtype
+    return schema
+
+
+def constant_columns(df: pl.DataFrame) -> list[str]:
+    """Columns holding a single value (or only nulls) on every row."""
+    counts = df.select(pl.all().drop_nulls().n_unique()).row(0, named=True)
+    return [name for name, n in counts.items() if n <= 1]
+
+
+def apply_schema(df: pl.DataFrame, schema: dict[str, pl.DataType]) -> pl.DataFrame:
+    """Cast the columns of ``df`` that appear in ``schema``."""
+    return df.cast({name: dtype for name, dtype in schema.items() if name in df.columns})
+
+
+def save_schema(schema: dict[str, pl.DataType], path: str | Path) -> None:
+    # An empty Arrow IPC file is the simplest way to persist a Polars schema
+    # (including Enum categories) without writing our own serializer.
+    pl.DataFrame(schema=schema).write_ipc(path)
+
+
+def load_schema(path: str | Path) -> dict[str, pl.DataType]:
+    return dict(pl.read_ipc_schema(path))
@@ -0,0 +1,267 @@
+"""Serve the chapter analyses over HTTP/JSON from one warm process.
+
+Running a chapter as a script means starting Python, importing everything
+and parsing the CSVs again, every time. The service does that once: it
+materializes every available dataset into the ``Catalog`` at startup and keeps
+a LazyFrame over each cached file. Every request only builds and runs a small
+query plan on top of those.
+
+Requests that arrive within ``batch_window`` seconds of each other are run
+together with ``pl.collect_all``, which lets Polars share the scans between
+them, and identical requests in a batch are only computed once. Batches run in
+a pool of ``workers`` threads. ``/metrics`` reports latency percentiles per
+endpoint. Everything reads local files only, so it works offline::
+
+    python -m cookbook_tools.service --port 8000
+    curl 'http://localhost:8000/top-complaint-types?n=5'
+    curl 'http://localhost:8000/metrics'
+
+The same queries can be run without HTTP through ``Service.query``.
+"""
+
+import argparse
+import inspect
+import json
+import queue
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+import polars as pl
+
+from cookbook_tools.catalog import DATA_DIR, Catalog
+from cookbook_tools.runner import CHAPTERS
+
+# URL path -> pipeline in ``runner.CHAPTERS``. The pipeline's keyword
+# arguments (everything after the LazyFrames) become query parameters.
+ENDPOINTS: dict[str, str] = {
+    "top-complaint-types": "chapter2_top_complaint_types",
+    "noise-ratio": "chapter3_noise_ratio_by_borough",
+    "weekday-bike-totals": "chapter4_weekday_bike_totals",
+    "monthly-snow-share": "chapter6_monthly_snow_share",
+    "recent-nonlibraries": "chapter8_recent_nonlibraries",
+}
+# Latencies kept per endpoint for the percentiles in ``/metrics``.
+LATENCY_WINDOW = 10_000
+PERCENTILES = (50, 90, 99)
+
+
+class NotFound(LookupError):
+    pass
+
+
+def parameters(endpoint: str) -> dict[str, object]:
+    """Query parameters of ``endpoint`` and their defaults."""
+    func, datasets = CHAPTERS[ENDPOINTS[endpoint]]
+    signature = inspect.signature(func).parameters.values()
+    return {param.name: param.default for param in list(signature)[len(datasets) :]}
+
+
+def percentile(values: list[float], p: float) -> float:
+    """Nearest-rank percentile of ``values``, which must be sorted."""
+    rank = max(1, -(-len(values) * p // 100))
+    return values[int(rank) - 1]
+
+
+class Service:
+    def __init__(
+        self,
+        catalog: Catalog | None = None,
+        workers: int = 4,
+        batch_window: float = 0.005,
+        max_batch: int = 32,
+    ):
+        self.catalog = catalog or Catalog()
+        # Parse every dataset now, so no request pays for it.
+        self.frames = {name: self.catalog.scan(name) for name in self.catalog.available()}
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="cookbook-service")
+        self._pending: queue.Queue[tuple[tuple, Future] | None] = queue.Queue()
+        self._lock = threading.Lock()
+        self._latencies: dict[str, deque[float]] = defaultdict(lambda: deque(maxlen=LATENCY_WINDOW))
+        self._errors: dict[str, int] = defaultdict(int)
+        self._batches = 0
+        self._batched_requests = 0
+        self._batcher = threading.Thread(target=self._batch_loop, name="cookbook-batcher", daemon=True)
+        self._batcher.start()
+
+    def endpoints(self) -> dict[str, dict]:
+        """Every endpoint, its parameters and whether its datasets are loaded."""
+        return {
+            endpoint: {
+                "parameters": parameters(endpoint),
+                "available": all(dataset in self.frames for dataset in CHAPTERS[chapter][1]),
+            }
+            for endpoint, chapter in ENDPOINTS.items()
+        }
+
+    def _request_key(self, endpoint: str, params: dict[str, str]) -> tuple:
+        # Raises NotFound for an unknown endpoint or missing data and
+        # ValueError for bad parameters, before the request is queued.
+        if endpoint not in ENDPOINTS:
+            raise NotFound(f"unknown endpoint {endpoint!r}")
+        _, datasets = CHAPTERS[ENDPOINTS[endpoint]]
+        if missing := [dataset for dataset in datasets if dataset not in self.frames]:
+            raise NotFound(f"{endpoint} needs {', '.join(missing)}, which is not in {self.catalog.data_dir}")
+        defaults = parameters(endpoint)
+        if unknown := set(params) - set(defaults):
+            raise ValueError(f"unknown parameters: {', '.join(sorted(unknown))}")
+        kwargs = dict(defaults)
+        for name, value in params.items():
+            kwargs[name] = type(defaults[name])(value)
+            if isinstance(kwargs[name], int) and kwargs[name] < 1:
+                raise ValueError(f"{name} must be at least 1")
+        return endpoint, tuple(sorted(kwargs.items()))
+
+    def _plan(self, key: tuple) -> pl.LazyFrame:
+        endpoint, kwargs = key
+        func, datasets = CHAPTERS[ENDPOINTS[endpoint]]
+        return func(*(self.frames[dataset] for dataset in datasets), **dict(kwargs))
+
+    def query(self, endpoint: str, params: dict[str, str] | None = None) -> pl.DataFrame:
+        """Run ``endpoint`` with ``params`` (strings, as in a query string)."""
+        start = time.perf_counter()
+        try:
+            future: Future = Future()
+            self._pending.put((self._request_key(endpoint, params or {}), future))
+            return future.result()
+        except Exception:
+            if endpoint in ENDPOINTS:
+                with self._lock:
+                    self._errors[endpoint] += 1
+            raise
+        finally:
+            if endpoint in ENDPOINTS:
+                with self._lock:
+                    self._latencies[endpoint].append(time.perf_counter() - start)
+
+    def _batch_loop(self) -> None:
+        while (first := self._pending.get()) is not None:
+            batch = [first]
+            deadline = time.perf_counter() + self.batch_window
+            while len(batch) < self.max_batch and (remaining := deadline - time.perf_counter()) > 0:
+                try:
+                    item = self._pending.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._pending.put(None)
+                    break
+                batch.append(item)
+            self._pool.submit(self._run_batch, batch)
+
+    def _run_batch(self, batch: list[tuple[tuple, Future]]) -> None:
+        futures: dict[tuple, list[Future]] = defaultdict(list)
+        for key, future in batch:
+            futures[key].append(future)
+        with self._lock:
+            self._batches += 1
+            self._batched_requests += len(batch)
+        try:
+            results = pl.collect_all([self._plan(key) for key in futures])
+        except Exception:
+            # Don't let one failing query fail the others: retry one by one.
+            results = []
+            for key in futures:
+                try:
+                    results.append(self._plan(key).collect())
+                except Exception as exc:
+                    results.append(exc)
+        for waiting, result in zip(futures.values(), results):
+            for future in waiting:
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+    def metrics(self) -> dict:
+        """Request counts and latency percentiles (ms) per endpoint."""
+        with self._lock:
+            latencies = {endpoint: sorted(values) for endpoint, values in self._latencies.items()}
+            errors = dict(self._errors)
+            batches, batched_requests = self._batches, self._batched_requests
+        endpoints = {}
+        for endpoint, values in latencies.items():
+            endpoints[endpoint] = {
+                "requests": len(values),
+                "errors": errors.get(endpoint, 0),
+                **{f"p{p}_ms": round(percentile(values, p) * 1000, 3) for p in PERCENTILES},
+                "max_ms": round(values[-1] * 1000, 3),
+            }
+        return {
+            "endpoints": endpoints,
+            "batches": batches,
+            "mean_batch_size": batched_requests / batches if batches else 0.0,
+        }
+
+    def close(self) -> None:
+        self._pending.put(None)
+        self._batcher.join()
+        self._pool.shutdown()
+
+
+def make_server(service: Service, host: str = "127.0.0.1", port: int = 8000) -> ThreadingHTTPServer:
+    """An HTTP server for ``service``; ``port=0`` picks a free port."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            url = urlsplit(self.path)
+            endpoint = url.path.strip("/")
+            try:
+                if endpoint == "":
+                    self._send(HTTPStatus.OK, json.dumps(service.endpoints()))
+                elif endpoint == "metrics":
+                    self._send(HTTPStatus.OK, json.dumps(service.metrics()))
+                else:
+                    result = service.query(endpoint, dict(parse_qsl(url.query)))
+                    self._send(HTTPStatus.OK, result.write_json())
+            except NotFound as exc:
+                self._send(HTTPStatus.NOT_FOUND, json.dumps({"error": str(exc)}))
+            except (ValueError, pl.exceptions.ColumnNotFoundError) as exc:
+                self._send(HTTPStatus.BAD_REQUEST, json.dumps({"error": str(exc)}))
+            except Exception as exc:
+                self._send(HTTPStatus.INTERNAL_SERVER_ERROR, json.dumps({"error": str(exc)}))
+
+        def _send(self, status: HTTPStatus, body: str) -> None:
+            data = body.encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format: str, *args) -> None:
+            # ``/metrics`` has the numbers; one stderr line per request is noise.
+            pass
+
+    return ThreadingHTTPServer((host, port), Handler)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--batch-window-ms", type=float, default=5.0)
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    args = parser.parse_args()
+
+    service = Service(Catalog(args.data_dir), args.workers, args.batch_window_ms / 1000)
+    server = make_server(service, args.host, args.port)
+    print(f"Serving {', '.join(ENDPOINTS)} on http://{args.host}:{server.server_port}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Cluster a table by its filter columns, so point filters become slices.
+
+``df.filter(pl.col("Complaint Type") == "Noise - Street/Sidewalk")`` compares
+every row. If the table is sorted by (Complaint Type, Borough) instead, all
+rows for a key are next to each other and can be found with a binary search
+(``search_sorted``) and returned with a zero-copy ``slice``. ``SortedIndex``
+keeps the sorted table together with an offset index (key -> row range).
+
+Writing the sorted table to Parquet also makes the row-group min/max
+statistics tight, so ``pl.scan_parquet(...).filter(...)`` can skip most row
+groups without reading them.
+"""
+
+import sys
+from pathlib import Path
+
+import polars as pl
+
+
+def _next_prefix(prefix: str) -> str | None:
+    # The smallest string that sorts after every string starting with `prefix`,
+    # or None if there is no such string (e.g. for "", which every string starts with).
+    prefix = prefix.rstrip(chr(sys.maxunicode))
+    if not prefix:
+        return None
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+class SortedIndex:
+    def __init__(self, df: pl.DataFrame, keys: list[str]):
+        self.keys = keys
+        # `sort` marks the first key as sorted, so Polars itself can also use
+        # fast paths (e.g. for `search_sorted` and `group_by`) on it later.
+        self.data = df.sort(keys, nulls_last=True)
+        self.ranges = (
+            self.data.with_row_index("offset")
+            .group_by(keys, maintain_order=True)
+            .agg(pl.col("offset").first(), pl.len().alias("length"))
+        )
+        self._offsets = {
+            tuple(row[:-2]): (row[-2], row[-1]) for row in self.ranges.iter_rows()
+        }
+
+    def _range(self, column: str, start: int, end: int, lo, hi=None) -> tuple[int, int]:
+        # Binary search for [lo, hi) (or == lo) within rows [start, end) of
+        # `column`, which are sorted because all earlier keys are equal there.
+        values = self.data[column].slice(start, end - start)
+        values = values.head(values.len() - values.null_count())
+        left = values.search_sorted(lo, side="left")
+        right = values.search_sorted(lo if hi is None else hi, side="right" if hi is None else "left")
+        return start + left, start + right
+
+    def equal(self, *values) -> pl.DataFrame:
+        """Rows whose first ``len(values)`` keys equal ``values``.
+
+        Like ``filter(pl.col(key) == value)``, a null never equals anything,
+        so asking for a ``None`` key gives no rows.
+        """
+        if any(value is None for value in values):
+            return self.data.clear()
+        if len(values) == len(self.keys):
+            offset, length = self._offsets.get(tuple(values), (0, 0))
+            return self.data.slice(offset, length)
+        start, end = 0, self.data.height
+        for column, value in zip(self.keys, values):
+            start, end = self._range(column, start, end, value)
+        return self.data.slice(start, end - start)
+
+    def startswith(self, prefix: str) -> pl.DataFrame:
+        """Rows whose first key starts with ``prefix``."""
+        if (upper := _next_prefix(prefix)) is None:
+            # Every non-null key from `prefix` on; nulls are sorted last.
+            end = self.data.height - self.data[self.keys[0]].null_count()
+            start, _ = self._range(self.keys[0], 0, end, prefix)
+            return self.data.slice(start, end - start)
+        start, end = self._range(self.keys[0], 0, self.data.height, prefix, upper)
+        return self.data.slice(start, end - start)
+
+    def write_parquet(self, path: str | Path, row_group_size: int = 64_000) -> None:
+        self.data.write_parquet(path, row_group_size=row_group_size, statistics=True)
@@ -0,0 +1,92 @@
+"""Persist a table as zstd Parquet, sorted, and remember that it is sorted.
+
+Chapter 5 used to save ``weather_2012`` as a CSV, and every reader then had to
+parse ``date_time`` again and sort by it again. ``write_sorted_parquet`` sorts
+once and writes zstd-compressed Parquet with min/max statistics for every row
+group, so a filter on a time range only reads the row groups it overlaps. The
+sort keys are stored in the file's key-value metadata, and
+``scan_sorted_parquet`` flags the leading key as sorted again, so ``join_asof``,
+``group_by_dynamic`` and ``search_sorted`` don't sort a second time.
+"""
+
+import json
+import os
+import tempfile
+from collections.abc import Sequence
+from pathlib import Path
+
+import polars as pl
+
+SORTED_BY_KEY = "cookbook:sorted_by"
+# About a month of hourly weather per row group: small enough that a time
+# range filter skips most of the file, big enough to compress well.
+ROW_GROUP_SIZE = 24 * 31
+
+
+def write_sorted_parquet(
+    frame: pl.DataFrame | pl.LazyFrame,
+    path: str | Path,
+    by: str | Sequence[str],
+    row_group_size: int = ROW_GROUP_SIZE,
+    compression_level: int | None = None,
+) -> Path:
+    """Sort ``frame`` by ``by`` and write it to ``path`` as zstd Parquet."""
+    path = Path(path)
+    by = [by] if isinstance(by, str) else list(by)
+    frame = frame.lazy().sort(by, maintain_order=True).collect()
+    # Write to a temporary file of our own next to the target and rename it,
+    # so readers never see half a file and concurrent writers don't collide.
+    with tempfile.NamedTemporaryFile(
+        dir=path.parent, prefix=f"{path.name}.", suffix=".tmp", delete=False
+    ) as f:
+        tmp = Path(f.name)
+    try:
+        frame.write_parquet(
+            tmp,
+            compression="zstd",
+            compression_level=compression_level,
+            statistics=True,
+            row_group_size=row_group_size,
+            metadata={SORTED_BY_KEY: json.dumps(by)},
+        )
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    return path
+
+
+def sorted_by(path: str | Path) -> list[str]:
+    """The sort keys ``write_sorted_parquet`` stored in ``path`` ([] if none)."""
+    metadata = pl.read_parquet_metadata(path)
+    return json.loads(metadata.get(SORTED_BY_KEY, "[]"))
+
+
+def scan_sorted_parquet(path: str | Path) -> pl.LazyFrame:
+    """Scan ``path`` with the leading sort key flagged as sorted.
+
+    Only the first key is sorted across the whole file; the others are only
+    sorted within runs of equal leading keys, so they are not flagged.
+    """
+    frame = pl.scan_parquet(path)
+    by = sorted_by(path)
+    return frame.set_sorted(by[0]) if by else frame
+
+
+def csv_to_sorted_parquet(
+    source: str | Path,
+    path: str | Path,
+    by: str | Sequence[str],
+    row_group_size: int = ROW_GROUP_SIZE,
+    **scan_kwargs,
+) -> Path:
+    """Convert ``source`` to sorted Parquet, unless ``path`` already exists.
+
+    ``source`` only seeds ``path``: once it exists, ``path`` is the copy that
+    gets updated (Chapter 5 writes the downloaded weather straight into it),
+    so it is never overwritten from ``source`` again, whatever the mtimes.
+    """
+    source, path = Path(source), Path(path)
+    if path.exists():
+        return path
+    return write_sorted_parquet(pl.scan_csv(source, **scan_kwargs), path, by, row_group_size)
@@ -0,0 +1,16 @@
+import numpy as np
+import polars as pl
+import pytest
+
+from cookbook_tools import approx
+
+
+@pytest.mark.parametrize("quantile", [0.01, 0.25, 0.5, 0.9, 0.99])
+def test_sketch_quantile_is_within_relative_accuracy_of_the_lower_quantile(quantile):
+    rng = np.random.default_rng(0)
+    df = pl.DataFrame({"g": rng.integers(0, 10, 5_000), "x": rng.standard_normal(5_000) * 10})
+    sketches = [approx.quantile_sketch(part, "x", by="g") for part in df.partition_by("g")]
+    estimate = approx.sketch_quantile(approx.merge_quantile_sketches(sketches, by="g"), quantile, by="g")
+    exact = df.group_by("g").agg(pl.col("x").quantile(quantile, interpolation="lower").alias("exact"))
+    error = estimate.join(exact, on="g").select(((pl.col("value") - pl.col("exact")) / pl.col("exact")).abs().max())
+    assert error.item() <= 0.01
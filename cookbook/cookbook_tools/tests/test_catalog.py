@@ -0,0 +1,52 @@
+import multiprocessing
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+
+import polars as pl
+from polars.testing import assert_frame_equal
+
+from cookbook_tools import catalog
+from cookbook_tools.catalog import DATA_DIR, Catalog, load_popcon, load_weather
+from cookbook_tools.sorted_parquet import write_sorted_parquet
+
+
+def _materialize(data_dir) -> str:
+    return Catalog(data_dir).materialize("popcon").name
+
+
+def test_concurrent_writers_leave_one_complete_file(tmp_path):
+    shutil.copy(DATA_DIR / "popularity-contest", tmp_path)
+    # Spawned, not forked: forking after Polars has started its thread pool can deadlock.
+    with ProcessPoolExecutor(max_workers=4, mp_context=multiprocessing.get_context("spawn")) as pool:
+        names = set(pool.map(_materialize, [tmp_path] * 8))
+    assert names == {Catalog(tmp_path).path("popcon").name}
+    assert [path.name for path in (tmp_path / ".catalog").iterdir()] == list(names)
+    assert_frame_equal(Catalog(tmp_path).get("popcon"), load_popcon(tmp_path).collect())
+
+
+def test_a_new_loader_version_is_not_served_the_old_cache(tmp_path, monkeypatch):
+    shutil.copy(DATA_DIR / "popularity-contest", tmp_path)
+    old = Catalog(tmp_path).materialize("popcon")
+
+    monkeypatch.setattr(catalog, "CACHE_VERSION", catalog.CACHE_VERSION + 1)
+    new = Catalog(tmp_path).materialize("popcon")
+    assert new != old
+    assert not old.exists()
+    assert Catalog(tmp_path).materialize("popcon") == new
+
+
+def test_weather_is_read_from_the_parquet_after_a_download(tmp_path):
+    shutil.copy(DATA_DIR / "weather_2012.csv", tmp_path)
+    weather = Catalog(tmp_path).get("weather")
+    assert (tmp_path / "weather_2012.parquet").exists()
+    assert load_weather(tmp_path).collect()["date_time"].flags["SORTED_ASC"]
+
+    # Chapter 5 downloads the year again and writes it straight into the Parquet file.
+    downloaded = weather.with_columns(pl.col("temperature_c") + 1)
+    write_sorted_parquet(downloaded, tmp_path / "weather_2012.parquet", by="date_time")
+    assert_frame_equal(Catalog(tmp_path).get("weather"), downloaded)
+
+    # A CSV that is newer than the Parquet file doesn't overwrite the download.
+    (tmp_path / "weather_2012.csv").touch()
+    assert_frame_equal(load_weather(tmp_path).collect(), downloaded)
+    assert_frame_equal(Catalog(tmp_path).get("weather"), downloaded)
@@ -0,0 +1,14 @@
+import pandas as pd
+
+from cookbook_tools.catalog import DATA_DIR
+from cookbook_tools.dual import read_both
+
+
+def test_popcon_gives_pandas_the_epoch_seconds_in_the_file():
+    popcon_pl, popcon = read_both("popcon")
+    raw = pd.read_csv(DATA_DIR / "popularity-contest", sep=" ")[:-1]
+    raw.columns = ["atime", "ctime", "package-name", "mru-program", "tag"]
+    for name in ("atime", "ctime"):
+        assert popcon[name].astype(int).tolist() == raw[name].astype(int).tolist()
+    assert popcon["package-name"].tolist() == raw["package-name"].tolist()
+    assert popcon_pl.schema["atime"].is_temporal()
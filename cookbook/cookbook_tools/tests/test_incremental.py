@@ -0,0 +1,61 @@
+import polars as pl
+from polars.testing import assert_frame_equal
+
+from cookbook_tools.catalog import load_complaints
+from cookbook_tools.incremental import KEYS, ComplaintCounter
+
+HEADER = "Unique Key,Complaint Type,Borough,Incident Zip\n"
+TYPES = ["Noise - Street/Sidewalk", "HEATING", "Blocked Driveway"]
+BOROUGHS = ["BROOKLYN", "QUEENS", "N/A", ""]
+
+
+def _lines(start: int, stop: int) -> list[str]:
+    return [f"{i},{TYPES[i % 3]},{BOROUGHS[i % 4]},1120{i % 10}\n" for i in range(start, stop)]
+
+
+def _full_counts(data_dir, *paths) -> pl.DataFrame:
+    # What the counter should agree with: all the files as one 311 file, read
+    # by the catalog and counted with a single group_by.
+    data_dir.mkdir(exist_ok=True)
+    body = "".join(path.read_text().removeprefix(HEADER) for path in paths)
+    (data_dir / "311-service-requests.csv").write_text(HEADER + body)
+    frame = load_complaints(data_dir).collect()
+    return frame.group_by(KEYS).agg(pl.len().cast(pl.UInt64).alias("count")).sort(KEYS)
+
+
+def test_counts_match_a_full_group_by_across_restarts(tmp_path):
+    feed = tmp_path / "feed"
+    feed.mkdir()
+    first = feed / "311-a.csv"
+    checkpoint = tmp_path / "counter.json"
+    lines = _lines(0, 500)
+
+    # The first chunk ends in the middle of a line: that line is not counted yet.
+    first.write_text(HEADER + "".join(lines[:200]) + lines[200][:7])
+    counter = ComplaintCounter(checkpoint)
+    assert counter.ingest(feed) == 200
+
+    # The writer finishes the line and appends more; a new process resumes from the checkpoint.
+    with open(first, "a") as f:
+        f.write(lines[200][7:] + "".join(lines[201:400]))
+    counter = ComplaintCounter(checkpoint)
+    assert counter.ingest(feed) == 200
+    assert counter.ingest(feed) == 0
+
+    # Another file is dropped into the directory, and the first one grows again.
+    second = feed / "311-b.csv"
+    second.write_text(HEADER + "".join(_lines(1000, 1100)))
+    with open(first, "a") as f:
+        f.write("".join(lines[400:]))
+    counter = ComplaintCounter(checkpoint)
+    assert counter.ingest(feed) == 200
+
+    expected = _full_counts(tmp_path / "full", first, second)
+    assert_frame_equal(counter.counts, expected)
+    expected_types = (
+        expected
+        .group_by("Complaint Type")
+        .agg(pl.col("count").sum())
+        .sort("count", "Complaint Type", descending=[True, False])
+    )
+    assert_frame_equal(counter.complaint_type_counts(), expected_types)
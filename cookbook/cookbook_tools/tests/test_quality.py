@@ -0,0 +1,16 @@
+import polars as pl
+
+from cookbook_tools.catalog import load_complaints
+from cookbook_tools.quality import profile_columns
+
+CSV = "Unique Key,Incident Zip\n1,11201\n2,N/A\n3,\n4,NO CLUE\n5,11201-1234\n"
+
+
+def test_profile_of_the_raw_file_sees_the_na_sentinels(tmp_path):
+    (tmp_path / "311-service-requests.csv").write_text(CSV)
+    raw = profile_columns(pl.scan_csv(tmp_path / "311-service-requests.csv", infer_schema=False), ["Incident Zip"])
+    assert raw.select("rows", "null_count", "na_count", "has_dash").row(0) == (5, 1, 2, 1)
+
+    # Read like the catalog does, "N/A" is already null and only "NO CLUE" is left to find.
+    cleaned = profile_columns(load_complaints(tmp_path), ["Incident Zip"])
+    assert cleaned.select("null_count", "na_count").row(0) == (2, 1)
@@ -0,0 +1,42 @@
+import polars as pl
+import pytest
+from polars.testing import assert_frame_equal
+
+from cookbook_tools.catalog import DATA_DIR, load_bikes, load_weather
+from cookbook_tools.ridership import ridership_weather
+
+
+@pytest.fixture(scope="module")
+def bikes():
+    return load_bikes(DATA_DIR).collect()
+
+
+@pytest.fixture(scope="module")
+def weather():
+    return load_weather(DATA_DIR).collect()
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_shuffled_input_gives_the_same_rows(bikes, weather, lazy):
+    expected = ridership_weather(bikes, weather)
+    assert expected["temperature_mean"].null_count() == 0
+
+    shuffled_bikes = bikes.sample(fraction=1, shuffle=True, seed=1)
+    shuffled_weather = weather.sample(fraction=1, shuffle=True, seed=2)
+    if lazy:
+        result = ridership_weather(shuffled_bikes.lazy(), shuffled_weather.lazy()).collect()
+    else:
+        result = ridership_weather(shuffled_bikes, shuffled_weather)
+    assert_frame_equal(result, expected)
+
+
+def test_counters_use_their_own_station(bikes, weather):
+    # A second station, 5 degrees warmer, interleaved with the first in time.
+    other = weather.with_columns(pl.lit("OTHER").alias("station_name"), pl.col("temperature_c") + 5)
+    both = pl.concat([weather, other]).sort("date_time")
+    result = ridership_weather(
+        bikes, both, {"OTHER": ["Berri 1"], "MONTREAL/PIERRE ELLIOTT TRUDEAU INTL A": ["Rachel1"]}
+    )
+    by_counter = result.pivot("counter", index="Date", values="temperature_mean")
+    assert by_counter.height == bikes.height
+    assert ((by_counter["Berri 1"] - by_counter["Rachel1"] - 5).abs() < 1e-9).all()
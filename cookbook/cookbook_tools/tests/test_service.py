@@ -0,0 +1,105 @@
+import json
+import shutil
+import threading
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from polars.testing import assert_frame_equal
+
+from cookbook_tools import pipelines
+from cookbook_tools.catalog import DATA_DIR, Catalog, load_bikes, load_popcon
+from cookbook_tools.service import PERCENTILES, NotFound, Service, make_server
+
+# Everything but the 311 data, which is not shipped either.
+SOURCES = ["bikes.csv", "weather_2012.csv", "popularity-contest"]
+
+
+@pytest.fixture(scope="module")
+def data_dir(tmp_path_factory):
+    data_dir = tmp_path_factory.mktemp("data")
+    for name in SOURCES:
+        shutil.copy(DATA_DIR / name, data_dir / name)
+    return data_dir
+
+
+@pytest.fixture
+def service(data_dir):
+    service = Service(Catalog(data_dir))
+    yield service
+    service.close()
+
+
+@pytest.fixture
+def server(service):
+    server = make_server(service, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+def _get(url: str) -> tuple[int, object]:
+    try:
+        with urllib.request.urlopen(url) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as exc:
+        return exc.code, json.loads(exc.read())
+
+
+def test_query_runs_the_chapter_pipelines(service, data_dir):
+    assert_frame_equal(
+        service.query("weekday-bike-totals"),
+        pipelines.weekday_bike_totals(load_bikes(data_dir)).collect(),
+    )
+    assert_frame_equal(
+        service.query("recent-nonlibraries", {"n": "3"}),
+        pipelines.recent_nonlibraries(load_popcon(data_dir), n=3).collect(),
+    )
+    assert service.query("monthly-snow-share").height == 12
+
+
+def test_query_rejects_bad_requests(service):
+    with pytest.raises(NotFound, match="unknown endpoint"):
+        service.query("no-such-endpoint")
+    with pytest.raises(NotFound, match="complaints"):
+        service.query("top-complaint-types")
+    with pytest.raises(ValueError, match="unknown parameters: m"):
+        service.query("recent-nonlibraries", {"m": "3"})
+    with pytest.raises(ValueError, match="at least 1"):
+        service.query("recent-nonlibraries", {"n": "0"})
+    with pytest.raises(ValueError):
+        service.query("recent-nonlibraries", {"n": "three"})
+    assert service.endpoints()["top-complaint-types"]["available"] is False
+
+
+def test_http_concurrent_requests_and_metrics(service, server):
+    urls = [f"{server}/weekday-bike-totals", f"{server}/recent-nonlibraries?n=2"] * 20
+    expected = {
+        urls[0]: json.loads(service.query("weekday-bike-totals").write_json()),
+        urls[1]: json.loads(service.query("recent-nonlibraries", {"n": "2"}).write_json()),
+    }
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        responses = list(pool.map(_get, urls))
+    for url, (status, body) in zip(urls, responses):
+        assert status == 200
+        assert body == expected[url]
+
+    assert _get(f"{server}/top-complaint-types")[0] == 404
+    assert _get(f"{server}/no-such-endpoint")[0] == 404
+    assert _get(f"{server}/recent-nonlibraries?n=0")[0] == 400
+    assert _get(f"{server}/recent-nonlibraries?m=2")[0] == 400
+
+    status, metrics = _get(f"{server}/metrics")
+    assert status == 200
+    bikes = metrics["endpoints"]["weekday-bike-totals"]
+    assert bikes["requests"] == 21
+    assert bikes["errors"] == 0
+    percentiles = [bikes[f"p{p}_ms"] for p in PERCENTILES]
+    assert percentiles == sorted(percentiles)
+    assert 0 < percentiles[0] <= bikes["max_ms"]
+    assert metrics["endpoints"]["recent-nonlibraries"]["errors"] == 2
+    assert metrics["batches"] >= 1
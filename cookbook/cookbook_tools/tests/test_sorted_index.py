@@ -0,0 +1,50 @@
+import sys
+
+import polars as pl
+import pytest
+from polars.testing import assert_frame_equal
+
+from cookbook_tools.sorted_index import SortedIndex
+
+LAST = chr(sys.maxunicode)
+
+
+@pytest.mark.parametrize("prefix", ["", "Noise", "N", "a" + LAST, LAST, "zz"])
+def test_startswith_matches_a_filter(prefix):
+    df = pl.DataFrame(
+        {
+            "Complaint Type": ["Noise", "", None, "HEATING", "a" + LAST, LAST + "x", "Noise - Park", None],
+            "Borough": ["QUEENS", "BRONX", "QUEENS", None, "BROOKLYN", "BRONX", None, "BRONX"],
+        }
+    )
+    index = SortedIndex(df, ["Complaint Type", "Borough"])
+    expected = index.data.filter(pl.col("Complaint Type").str.starts_with(prefix))
+    assert_frame_equal(index.startswith(prefix), expected)
+
+
+def _filter(df: pl.DataFrame, keys: list[str], values: tuple) -> pl.DataFrame:
+    return df.filter(*(pl.col(key) == pl.lit(value, pl.String) for key, value in zip(keys, values)))
+
+
+@pytest.mark.parametrize(
+    "values",
+    [
+        ("Noise", "QUEENS"),
+        ("Noise", None),
+        (None, "BRONX"),
+        (None, None),
+        ("Noise",),
+        (None,),
+        ("HEATING", "BROOKLYN"),
+    ],
+)
+def test_equal_matches_a_filter_for_full_and_partial_keys(values):
+    df = pl.DataFrame(
+        {
+            "Complaint Type": ["Noise", "Noise", None, "HEATING", None, "Noise", "HEATING"],
+            "Borough": ["QUEENS", None, "BRONX", None, None, "QUEENS", "BRONX"],
+        }
+    )
+    keys = ["Complaint Type", "Borough"]
+    index = SortedIndex(df, keys)
+    assert_frame_equal(index.equal(*values), _filter(index.data, keys, values))
@@ -0,0 +1,29 @@
+import pytest
+
+from cookbook_tools import transcode
+
+CSV = "Date;Brébeuf;Berri 1\n01/01/2012;1;35\n".encode("latin1")
+
+
+def test_transcode_to_utf8(tmp_path):
+    source = tmp_path / "bikes.csv"
+    source.write_bytes(CSV)
+    target = transcode.transcode_to_utf8(source, tmp_path / "bikes.csv.utf8.csv", chunk_size=7)
+    assert target.read_text(encoding="utf-8") == CSV.decode("latin1")
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["bikes.csv", "bikes.csv.utf8.csv"]
+
+
+def test_a_failed_transcode_leaves_the_old_target_alone(tmp_path, monkeypatch):
+    source = tmp_path / "bikes.csv"
+    source.write_bytes(CSV)
+    target = tmp_path / "bikes.csv.utf8.csv"
+    target.write_text("old")
+
+    def fail(text):
+        raise RuntimeError("disk full")
+
+    monkeypatch.setattr(transcode, "repair_mojibake", fail)
+    with pytest.raises(RuntimeError):
+        transcode.transcode_to_utf8(source, target)
+    assert target.read_text() == "old"
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["bikes.csv", "bikes.csv.utf8.csv"]
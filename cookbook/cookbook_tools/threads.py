@@ -0,0 +1,170 @@
+"""Measure how the chapter pipelines scale with threads, and pin thread budgets.
+
+Polars sizes its thread pool once, from ``POLARS_MAX_THREADS``, when it is
+first imported. So the only way to run a pipeline with a given number of
+threads is to run it in a fresh process with that variable set, which is what
+``run_in_subprocess`` does. On top of that:
+
+* ``scaling_benchmark`` runs every pipeline at 1..N threads and reports the
+  speedup over one thread (``plot_scaling`` draws the curves), and
+* ``load_budgets`` reads a thread budget per pipeline, which the runner uses
+  with ``--executor subprocess`` so concurrent jobs don't oversubscribe a node.
+
+Run it from the ``cookbook`` folder::
+
+    python -m cookbook_tools.threads bench --max-threads 8 --plot
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import polars as pl
+
+from cookbook_tools.catalog import DATA_DIR, Catalog
+
+# JSON like {"default": 2, "chapter2_top_complaint_types": 4}, from a file or
+# from this environment variable.
+BUDGETS_ENV = "COOKBOOK_THREAD_BUDGETS"
+
+
+def load_budgets(path: str | Path | None = None) -> dict[str, int]:
+    if path is not None:
+        return json.loads(Path(path).read_text())
+    return json.loads(os.environ.get(BUDGETS_ENV, "{}"))
+
+
+def budget_for(name: str, budgets: dict[str, int]) -> int | None:
+    return budgets.get(name, budgets.get("default"))
+
+
+def thread_counts(max_threads: int) -> list[int]:
+    """1, 2, 4, ... up to ``max_threads`` (always included)."""
+    counts = [1]
+    while counts[-1] * 2 < max_threads:
+        counts.append(counts[-1] * 2)
+    return sorted({*counts, max_threads})
+
+
+def run_in_subprocess(
+    chapter: str,
+    threads: int | None,
+    data_dir: str | Path = DATA_DIR,
+    repeat: int = 1,
+) -> tuple[float, pl.DataFrame]:
+    """Run one chapter pipeline with ``threads`` Polars threads.
+
+    Returns the fastest of ``repeat`` runs (in seconds, excluding start-up)
+    and the pipeline's result.
+    """
+    env = dict(os.environ)
+    if threads is not None:
+        env["POLARS_MAX_THREADS"] = str(threads)
+    with tempfile.TemporaryDirectory() as tmp:
+        out = Path(tmp) / "result.arrow"
+        completed = subprocess.run(
+            [sys.executable, "-m", "cookbook_tools.threads", "worker", chapter,
+             "--data-dir", str(data_dir), "--out", str(out), "--repeat", str(repeat)],
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).resolve().parents[1],
+        )
+        return json.loads(completed.stdout)["seconds"], pl.read_ipc(out.read_bytes())
+
+
+def scaling_benchmark(
+    chapters: list[str] | None = None,
+    max_threads: int | None = None,
+    repeat: int = 3,
+    data_dir: str | Path = DATA_DIR,
+) -> pl.DataFrame:
+    """Time every pipeline at 1..``max_threads`` threads."""
+    from cookbook_tools.runner import CHAPTERS
+
+    catalog = Catalog(data_dir)
+    available = set(catalog.available())
+    rows = []
+    for chapter in chapters or CHAPTERS:
+        datasets = CHAPTERS[chapter][1]
+        if not set(datasets) <= available:
+            continue
+        for dataset in datasets:
+            catalog.materialize(dataset)  # don't time the first parse
+        for threads in thread_counts(max_threads or os.cpu_count() or 1):
+            seconds, _ = run_in_subprocess(chapter, threads, data_dir, repeat)
+            rows.append({"chapter": chapter, "threads": threads, "seconds": seconds})
+    return pl.DataFrame(rows).with_columns(
+        (pl.col("seconds").first().over("chapter") / pl.col("seconds")).alias("speedup")
+    )
+
+
+def plot_scaling(results: pl.DataFrame):
+    import matplotlib.pyplot as plt
+
+    from cookbook_tools.plotting import RC_PARAMS, STYLE
+
+    with plt.style.context(STYLE), plt.rc_context(RC_PARAMS):
+        fig, ax = plt.subplots()
+        for (chapter,), curve in results.group_by("chapter", maintain_order=True):
+            ax.plot(curve["threads"], curve["speedup"], marker="o", label=chapter)
+        top = results["threads"].max()
+        ax.plot([1, top], [1, top], linestyle="--", color="grey", label="linear")
+        ax.set_xlabel("POLARS_MAX_THREADS")
+        ax.set_ylabel("speedup over 1 thread")
+        ax.legend()
+        fig.tight_layout()
+    return fig
+
+
+def _worker(chapter: str, data_dir: str, out: str, repeat: int) -> None:
+    from cookbook_tools.runner import CHAPTERS
+
+    func, datasets = CHAPTERS[chapter]
+    catalog = Catalog(data_dir)
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*(catalog.scan(dataset) for dataset in datasets)).collect()
+        best = min(best, time.perf_counter() - start)
+    result.write_ipc(out)
+    print(json.dumps({"seconds": best, "threads": pl.thread_pool_size()}))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    bench = commands.add_parser("bench", help="run the thread-scaling benchmark")
+    bench.add_argument("chapters", nargs="*")
+    bench.add_argument("--max-threads", type=int, default=None)
+    bench.add_argument("--repeat", type=int, default=3)
+    bench.add_argument("--data-dir", default=DATA_DIR)
+    bench.add_argument("--plot", action="store_true")
+    worker = commands.add_parser("worker", help="(internal) run one pipeline")
+    worker.add_argument("chapter")
+    worker.add_argument("--data-dir", default=DATA_DIR)
+    worker.add_argument("--out", required=True)
+    worker.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args()
+
+    if args.command == "worker":
+        _worker(args.chapter, args.data_dir, args.out, args.repeat)
+        return
+    results = scaling_benchmark(args.chapters or None, args.max_threads, args.repeat, args.data_dir)
+    with pl.Config(tbl_rows=-1):
+        print(results)
+    if args.plot:
+        import matplotlib.pyplot as plt
+
+        plot_scaling(results)
+        plt.show()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Turn epoch numbers and date strings into ``Datetime`` in one expression.
+
+Chapter 8 multiplies epoch seconds by 1000 into a new column, casts that to a
+``Datetime`` and then filters out the ``0`` timestamps, which keeps several
+copies of every timestamp column around. ``epoch_to_datetime`` does it all in
+one native expression: it figures out the unit (s, ms, us or ns) from the
+magnitude of the values if you don't give one, and maps sentinel values (0,
+negative or absurdly far in the future) to null on the way.
+"""
+
+from collections.abc import Sequence
+from datetime import datetime, timedelta
+
+import polars as pl
+
+EPOCH = datetime(1970, 1, 1)
+# Timestamps outside (MIN_VALID, MAX_VALID) are treated as missing.
+MIN_VALID = EPOCH
+MAX_VALID = datetime(2100, 1, 1)
+
+# Microseconds per unit, and the largest typical magnitude of a present-day
+# timestamp in that unit (now is ~1.7e9 s, ~1.7e12 ms, ...).
+MICROSECONDS = {"s": 1_000_000, "ms": 1_000, "us": 1, "ns": 0.001}
+MAGNITUDE_LIMITS = {"s": 1e11, "ms": 1e14, "us": 1e17}
+
+
+def _micros(moment: datetime) -> int:
+    return (moment - EPOCH) // timedelta(microseconds=1)
+
+
+def _in_unit(x: pl.Expr, unit: str, min_valid: datetime, max_valid: datetime) -> pl.Expr:
+    # Check the bounds in the column's own unit, before scaling, so a huge
+    # sentinel can't overflow when it is multiplied.
+    per_unit = MICROSECONDS[unit]
+    lo, hi = _micros(min_valid) / per_unit, _micros(max_valid) / per_unit
+    micros = x * int(per_unit) if per_unit >= 1 else x // int(1 / per_unit)
+    return pl.when((x > lo) & (x < hi)).then(micros)
+
+
+def epoch_to_datetime(
+    x: pl.Expr | str,
+    unit: str | None = None,
+    time_unit: str = "us",
+    min_valid: datetime = MIN_VALID,
+    max_valid: datetime = MAX_VALID,
+) -> pl.Expr:
+    """Epoch numbers (in ``unit``, or inferred if None) to ``Datetime(time_unit)``."""
+    x = pl.col(x) if isinstance(x, str) else x
+    x = x.cast(pl.Int64)
+    if unit is not None:
+        micros = _in_unit(x, unit, min_valid, max_valid)
+    else:
+        # The median positive value is not thrown off by sentinels.
+        magnitude = x.filter(x > 0).median()
+        micros = pl.when(magnitude < MAGNITUDE_LIMITS["s"]).then(_in_unit(x, "s", min_valid, max_valid))
+        for candidate in ("ms", "us"):
+            micros = micros.when(magnitude < MAGNITUDE_LIMITS[candidate]).then(
+                _in_unit(x, candidate, min_valid, max_valid)
+            )
+        micros = micros.otherwise(_in_unit(x, "ns", min_valid, max_valid))
+    return micros.cast(pl.Datetime("us")).dt.cast_time_unit(time_unit)
+
+
+def parse_datetime(
+    x: pl.Expr | str,
+    format: str | None = None,
+    time_unit: str = "us",
+    min_valid: datetime = MIN_VALID,
+    max_valid: datetime = MAX_VALID,
+) -> pl.Expr:
+    """Date strings (e.g. ``date_time`` in weather_2012.csv) to ``Datetime(time_unit)``.
+
+    Strings that don't parse, and dates outside (``min_valid``, ``max_valid``),
+    become null.
+    """
+    x = pl.col(x) if isinstance(x, str) else x
+    parsed = x.str.to_datetime(format, time_unit=time_unit, strict=False)
+    return pl.when((parsed > min_valid) & (parsed < max_valid)).then(parsed)
+
+
+def normalize_timestamps(
+    frame: pl.DataFrame | pl.LazyFrame,
+    columns: Sequence[str],
+    unit: str | None = None,
+    time_unit: str = "us",
+) -> pl.DataFrame | pl.LazyFrame:
+    """Convert ``columns`` to ``Datetime`` according to their dtype: epoch
+    numbers, date strings, or datetimes that only need the sentinel check."""
+    schema = frame.collect_schema() if isinstance(frame, pl.LazyFrame) else frame.schema
+    exprs = []
+    for name in columns:
+        dtype = schema[name]
+        if dtype.is_numeric():
+            exprs.append(epoch_to_datetime(name, unit, time_unit).alias(name))
+        elif dtype == pl.String:
+            exprs.append(parse_datetime(name, time_unit=time_unit).alias(name))
+        elif isinstance(dtype, pl.Datetime):
+            column = pl.col(name).dt.cast_time_unit(time_unit)
+            exprs.append(pl.when((column > MIN_VALID) & (column < MAX_VALID)).then(column).alias(name))
+    return frame.with_columns(exprs)
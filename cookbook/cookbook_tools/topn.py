@@ -0,0 +1,117 @@
+"""Keep the first N rows of an ordering without sorting everything.
+
+``df.sort("count", descending=True).head(10)`` sorts all the rows only to throw
+most of them away. ``top_k``/``bottom_k`` do a partial sort instead, but their
+output order is unspecified and ties are broken arbitrarily. The helpers here
+wrap them so they behave exactly like ``sort(...).head(n)``: rows come back in
+order, rows that tie on every key keep their original order, and nulls sort
+first unless ``nulls_last=True`` (``sort``'s default, in either direction).
+"""
+
+from collections.abc import Iterable, Sequence
+
+import polars as pl
+
+ROW_INDEX = "__topn_row"
+GROUP_INDEX = "__topn_group"
+OFFSET = "__topn_offset"
+
+Frame = pl.DataFrame | pl.LazyFrame
+
+
+def _as_list(columns: str | Sequence[str]) -> list[str]:
+    return [columns] if isinstance(columns, str) else list(columns)
+
+
+def _directions(by: list[str], descending: bool | Sequence[bool]) -> list[bool]:
+    if isinstance(descending, bool):
+        return [descending] * len(by)
+    if len(descending) != len(by):
+        raise ValueError("`descending` needs one value per column in `by`")
+    return list(descending)
+
+
+def _keys(by: list[str], directions: list[bool], nulls_last: bool) -> tuple[list[pl.Expr], list[bool]]:
+    # The keys and `reverse` flags for `top_k`, which keeps the largest values
+    # and has no null ordering of its own: every column is preceded by a flag
+    # that is True for the rows that have to come first, nulls or not.
+    keys, reverse = [], []
+    for name, d in zip(by, directions):
+        column = pl.col(name)
+        keys += [column.is_not_null() if nulls_last else column.is_null(), column]
+        reverse += [False, not d]
+    return [*keys, pl.col(ROW_INDEX)], [*reverse, True]
+
+
+def top_n(
+    frame: Frame,
+    n: int,
+    by: str | Sequence[str],
+    descending: bool | Sequence[bool] = True,
+    nulls_last: bool = False,
+) -> Frame:
+    """Same result as ``frame.sort(by, descending=descending, nulls_last=nulls_last).head(n)``."""
+    by = _as_list(by)
+    directions = _directions(by, descending)
+    # `top_k` keeps the largest values, so ascending keys are reversed. The
+    # row index breaks ties in favour of the earliest row, like a stable sort.
+    keys, reverse = _keys(by, directions, nulls_last)
+    return (
+        frame.with_row_index(ROW_INDEX)
+        .top_k(n, by=keys, reverse=reverse)
+        .sort([*by, ROW_INDEX], descending=[*directions, False], nulls_last=nulls_last)
+        .drop(ROW_INDEX)
+    )
+
+
+def top_n_per_group(
+    frame: Frame,
+    n: int,
+    by: str | Sequence[str],
+    group_by: str | Sequence[str],
+    descending: bool | Sequence[bool] = True,
+    nulls_last: bool = False,
+) -> Frame:
+    """The ``top_n`` rows of every group, groups in order of first appearance."""
+    by = _as_list(by)
+    group_by = _as_list(group_by)
+    directions = _directions(by, descending)
+    keys, reverse = _keys(by, directions, nulls_last)
+    return (
+        frame.with_row_index(ROW_INDEX)
+        .group_by(group_by, maintain_order=True)
+        .agg(pl.all().top_k_by(keys, k=n, reverse=reverse))
+        .with_row_index(GROUP_INDEX)
+        .explode(pl.all().exclude(GROUP_INDEX, *group_by))
+        .sort([GROUP_INDEX, *by, ROW_INDEX], descending=[False, *directions, False], nulls_last=nulls_last)
+        .drop(GROUP_INDEX, ROW_INDEX)
+    )
+
+
+def top_n_batches(
+    batches: Iterable[pl.DataFrame],
+    n: int,
+    by: str | Sequence[str],
+    descending: bool | Sequence[bool] = True,
+    nulls_last: bool = False,
+) -> pl.DataFrame:
+    """``top_n`` over a stream of frames, holding at most ``n`` + one batch in memory.
+
+    Works with anything that yields DataFrames, e.g. the batches of
+    ``pl.read_csv_batched(...)``.
+    """
+    by = _as_list(by)
+    # The position in the whole stream is the last key, so ties between
+    # batches are broken the same way `top_n` breaks them within one frame.
+    keys = [*by, OFFSET]
+    directions = [*_directions(by, descending), False]
+    best = None
+    offset = 0
+    for batch in batches:
+        batch = batch.with_row_index(OFFSET, offset=offset)
+        offset += batch.height
+        candidates = batch if best is None else pl.concat([best, batch])
+        best = top_n(candidates, n, keys, directions, nulls_last)
+    if best is None:
+        raise ValueError("`batches` is empty")
+    return best.drop(OFFSET)
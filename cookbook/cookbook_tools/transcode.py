@@ -0,0 +1,103 @@
+"""Read Latin-1/CP1252 CSV files lazily, without decoding them in one go.
+
+``pl.read_csv(..., encoding="latin1")`` decodes the whole file in Python before
+Polars gets to parse it, and there is no ``scan_csv`` equivalent. Here we
+transcode the file to UTF-8 in fixed-size blocks into a sidecar file, which
+``pl.scan_csv`` can then read lazily. Peak memory is one block, whatever the
+size of the file.
+"""
+
+import codecs
+import os
+import re
+import tempfile
+from pathlib import Path
+
+import polars as pl
+
+CHUNK_SIZE = 1 << 20  # 1 MiB
+NON_ASCII_RUN = re.compile(r"[^\x00-\x7f]+")
+
+
+def _repair_run(match: re.Match) -> str:
+    run = match.group()
+    for encoding in ("cp1252", "latin1"):
+        try:
+            return run.encode(encoding).decode("utf-8")
+        except UnicodeError:
+            continue
+    return run
+
+
+def repair_mojibake(text: str) -> str:
+    """Undo UTF-8 text that was decoded as Latin-1/CP1252, e.g. ``Ã©`` -> ``é``.
+
+    Every run of non-ASCII characters is repaired on its own, so correctly
+    decoded text (``Brébeuf``) next to mangled text (``Â°C``) is left alone.
+    A leading byte order mark (``ï»¿`` once mangled) is dropped as well.
+    """
+    return NON_ASCII_RUN.sub(_repair_run, text).lstrip("\ufeff")
+
+
+def transcode_to_utf8(
+    source: str | Path,
+    target: str | Path,
+    encoding: str = "latin1",
+    chunk_size: int = CHUNK_SIZE,
+) -> Path:
+    """Stream ``source`` into ``target`` as UTF-8, ``chunk_size`` bytes at a time.
+
+    The header line is passed through ``repair_mojibake``, so a file that was
+    already mangled once comes out with readable column names.
+    """
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    target = Path(target)
+    # Write to a temporary file of our own and rename it, so nobody (e.g.
+    # `scan_csv` in another process) ever sees a half-written ``target``.
+    dst = tempfile.NamedTemporaryFile(
+        "w", encoding="utf-8", newline="", dir=target.parent, prefix=f"{target.name}.", suffix=".tmp", delete=False
+    )
+    try:
+        with open(source, "rb") as src, dst:
+            header_done = False
+            pending = ""
+            while chunk := src.read(chunk_size):
+                text = decoder.decode(chunk)
+                if not header_done:
+                    pending += text
+                    if "\n" not in pending:
+                        continue
+                    header, text = pending.split("\n", 1)
+                    dst.write(repair_mojibake(header) + "\n")
+                    header_done = True
+                dst.write(text)
+            if not header_done:
+                dst.write(repair_mojibake(pending))
+            dst.write(decoder.decode(b"", final=True))
+        os.replace(dst.name, target)
+    except BaseException:
+        Path(dst.name).unlink(missing_ok=True)
+        raise
+    return target
+
+
+def scan_csv(
+    source: str | Path,
+    encoding: str = "latin1",
+    cache_dir: str | Path | None = None,
+    chunk_size: int = CHUNK_SIZE,
+    **scan_kwargs,
+) -> pl.LazyFrame:
+    """Like ``pl.scan_csv``, but for files that are not UTF-8.
+
+    The UTF-8 copy is written to ``cache_dir`` (next to ``source`` by default)
+    and only rebuilt when ``source`` is newer than it.
+    """
+    source = Path(source)
+    if encoding.lower().replace("-", "").replace("_", "") in ("utf8", "utf8lossy"):
+        return pl.scan_csv(source, **scan_kwargs)
+
+    target = Path(cache_dir or source.parent) / f"{source.name}.utf8.csv"
+    if not target.exists() or target.stat().st_mtime < source.stat().st_mtime:
+        transcode_to_utf8(source, target, encoding=encoding, chunk_size=chunk_size)
+    return pl.scan_csv(target, **scan_kwargs)